@@ -2,37 +2,200 @@ import json
 import os
 from datetime import datetime
 from collections import defaultdict
+from itertools import islice
+
+CATEGORIAS = {
+    'gasto': ['Comida', 'Transporte', 'Entretenimiento', 'Servicios', 'Salud', 'Otros'],
+    'ingreso': ['Salario', 'Freelance', 'Inversiones', 'Otros']
+}
+# Campos que usan los totales; una transacción del diario sin alguno no se puede aplicar
+CAMPOS_TRANSACCION = ('id', 'fecha', 'tipo', 'categoria', 'monto')
+# Tipo de cada campo conocido; el id es la clave de la transacción y no se edita
+TIPOS_CAMPO = {'id': int, 'fecha': str, 'tipo': str, 'categoria': str, 'monto': (int, float), 'descripcion': str}
+CAMPOS_EDITABLES = ('fecha', 'tipo', 'categoria', 'monto', 'descripcion')
+
+def es_numero(valor):
+    # bool es subclase de int, pero True no es un monto
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+def revisar_campos(campos, permitidos, obligatorios=()):
+    """ValueError si a campos le falta uno obligatorio, trae uno no permitido o un valor de otro tipo"""
+    if not isinstance(campos, dict):
+        raise ValueError("se esperaba un objeto con los campos de la transacción")
+    faltan = [campo for campo in obligatorios if campo not in campos]
+    if faltan:
+        raise ValueError(f"faltan campos: {', '.join(faltan)}")
+    desconocidos = [campo for campo in campos if campo not in permitidos]
+    if desconocidos:
+        raise ValueError(f"campos que no se pueden usar: {', '.join(map(str, desconocidos))}")
+    for campo, valor in campos.items():
+        tipo = TIPOS_CAMPO[campo]
+        if isinstance(valor, bool) or not isinstance(valor, tipo):
+            raise ValueError(f"el campo {campo} tiene un valor inválido: {valor!r}")
 
 class ControlFinanciero:
+    """Transacciones y meta de ahorro guardadas en un diario JSON-lines.
+
+    Cada cambio agrega una línea al diario (una transacción nueva, los campos
+    editados o una lápida al borrar), así guardar cuesta lo mismo con diez
+    transacciones que con cien mil. Cuando las líneas que ya no cuentan superan
+    a las vivas el diario se reescribe en un temporal y se cambia por el original
+    con os.replace, de modo que un corte a mitad nunca deja el registro a medias.
+
+    Los IDs salen de un contador que también se guarda en el diario, así nunca
+    se repiten aunque se borren transacciones ni entre una sesión y otra.
+    """
+    LIMITE_COMPACTACION = 1000  # líneas sobrantes que se toleran antes de compactar
+
     def __init__(self, archivo='finanzas.json'):
         self.archivo = archivo
-        self.transacciones = []
+        self.diario = os.path.splitext(archivo)[0] + '.jsonl'
+        self.lineas_diario = 0
+        self.transacciones = {}   # id -> transacción, en el orden en que se agregaron
+        self.siguiente_id = 1
         self.meta_ahorro = 10000
-        self.categorias = {
-            'gasto': ['Comida', 'Transporte', 'Entretenimiento', 'Servicios', 'Salud', 'Otros'],
-            'ingreso': ['Salario', 'Freelance', 'Inversiones', 'Otros']
-        }
+        self.categorias = CATEGORIAS
+        # Totales en centavos, al día con cada cambio: sumar enteros no acumula error
+        self.totales_tipo = defaultdict(int)        # tipo -> centavos
+        self.totales_categoria = defaultdict(int)   # (tipo, categoria) -> centavos
+        self.totales_mes = defaultdict(int)         # ('aaaa-mm', tipo) -> centavos
         self.cargar_datos()
     
     def cargar_datos(self):
-        """Carga los datos desde el archivo JSON"""
-        if os.path.exists(self.archivo):
+        """Carga el diario; si solo existe el finanzas.json de antes, lo pasa a diario"""
+        repetidas = []
+        migrar = False
+        if os.path.exists(self.diario):
+            self.leer_diario(repetidas)
+        elif os.path.exists(self.archivo):
             try:
                 with open(self.archivo, 'r', encoding='utf-8') as f:
                     datos = json.load(f)
-                    self.transacciones = datos.get('transacciones', [])
+                    for t in datos.get('transacciones', []):
+                        self.incorporar(t, repetidas)
                     self.meta_ahorro = datos.get('meta_ahorro', 10000)
+                # El JSON viejo queda como estaba; desde ahora se usa el diario
+                migrar = True
             except:
                 print("⚠️  Error al cargar datos. Iniciando con datos vacíos.")
+        if repetidas:
+            self.renumerar(repetidas)
+        if migrar or repetidas:
+            self.compactar()
+        self.reconstruir_totales()
+    
+    def incorporar(self, t, repetidas):
+        """Agrega una transacción ya guardada; si su ID está ocupado la aparta en repetidas"""
+        if t['id'] in self.transacciones:
+            repetidas.append(t)
+            return
+        self.transacciones[t['id']] = t
+        self.siguiente_id = max(self.siguiente_id, t['id'] + 1)
+    
+    def renumerar(self, repetidas):
+        """Da IDs nuevos a las transacciones que repetían uno (archivos de antes del contador)"""
+        for t in repetidas:
+            t['id'] = self.siguiente_id
+            self.siguiente_id += 1
+            self.transacciones[t['id']] = t
+        print(f"⚠️  {len(repetidas)} transacciones tenían un ID repetido; se les dio uno nuevo.")
+    
+    def leer_diario(self, repetidas):
+        """Aplica el diario línea por línea sin cargarlo entero en memoria.
+        
+        Solo se recorta del archivo una última línea sin salto de línea (el programa
+        se cerró mientras escribía), para que la siguiente escritura empiece limpia.
+        Una línea completa que no se puede aplicar se salta con un aviso y queda en
+        el archivo: las siguientes siguen siendo válidas.
+        """
+        completos = 0
+        corruptas = []
+        with open(self.diario, 'rb') as f:
+            for numero, linea in enumerate(f, 1):
+                if not linea.endswith(b'\n'):
+                    break
+                completos += len(linea)
+                self.lineas_diario += 1
+                try:
+                    self.aplicar_entrada(json.loads(linea), repetidas)
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    corruptas.append(numero)
+        if corruptas:
+            print(f"⚠️  Se saltaron {len(corruptas)} líneas dañadas del diario (la primera es la {corruptas[0]}).")
+        if completos < os.path.getsize(self.diario):
+            print("⚠️  El diario terminaba en una línea incompleta; se descartó.")
+            with open(self.diario, 'r+b') as f:
+                f.truncate(completos)
+    
+    def aplicar_entrada(self, entrada, repetidas):
+        """Repite en memoria un cambio leído del diario"""
+        op = entrada['op']
+        if op == 'agregar':
+            transaccion = entrada['transaccion']
+            revisar_campos(transaccion, TIPOS_CAMPO, CAMPOS_TRANSACCION)
+            self.incorporar(transaccion, repetidas)
+        elif op == 'editar':
+            revisar_campos(entrada['cambios'], CAMPOS_EDITABLES)
+            transaccion = self.transacciones.get(entrada['id'])
+            if transaccion is not None:
+                transaccion.update(entrada['cambios'])
+        elif op == 'eliminar':
+            self.transacciones.pop(entrada['id'], None)
+        elif op == 'meta':
+            if not es_numero(entrada['meta_ahorro']):
+                raise ValueError(f"meta de ahorro inválida: {entrada['meta_ahorro']!r}")
+            self.meta_ahorro = entrada['meta_ahorro']
+        elif op == 'contador':
+            if not isinstance(entrada['siguiente_id'], int):
+                raise ValueError(f"contador inválido: {entrada['siguiente_id']!r}")
+            self.siguiente_id = max(self.siguiente_id, entrada['siguiente_id'])
+        else:
+            raise ValueError(f"operación desconocida: {op!r}")
+    
+    def reconstruir_totales(self):
+        """Recorre las transacciones una vez; después los totales se actualizan con cada cambio"""
+        self.totales_tipo.clear()
+        self.totales_categoria.clear()
+        self.totales_mes.clear()
+        for t in self.transacciones.values():
+            self.sumar_a_totales(t, 1)
+    
+    def sumar_a_totales(self, t, signo):
+        """Suma (signo 1) o resta (signo -1) una transacción de los totales"""
+        centavos = signo * round(t['monto'] * 100)
+        self.totales_tipo[t['tipo']] += centavos
+        self.totales_categoria[(t['tipo'], t['categoria'])] += centavos
+        self.totales_mes[(t['fecha'][:7], t['tipo'])] += centavos
+    
+    def anotar(self, *entradas):
+        """Agrega entradas al final del diario con un solo fsync; compacta si sobran muchas líneas"""
+        texto = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in entradas)
+        with open(self.diario, 'a', encoding='utf-8') as f:
+            f.write(texto)
+            f.flush()
+            os.fsync(f.fileno())
+        self.lineas_diario += len(entradas)
+        sobrantes = self.lineas_diario - len(self.transacciones) - 2  # sin contar meta y contador
+        if sobrantes > max(self.LIMITE_COMPACTACION, len(self.transacciones)):
+            self.compactar()
+    
+    def compactar(self):
+        """Reescribe el diario con la meta, el contador de IDs y una línea por transacción viva"""
+        temporal = self.diario + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'meta', 'meta_ahorro': self.meta_ahorro}) + '\n')
+            # El contador va aparte: el ID más alto pudo haberse borrado
+            f.write(json.dumps({'op': 'contador', 'siguiente_id': self.siguiente_id}) + '\n')
+            for t in self.transacciones.values():
+                f.write(json.dumps({'op': 'agregar', 'transaccion': t}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.diario)
+        self.lineas_diario = len(self.transacciones) + 2
     
     def guardar_datos(self):
-        """Guarda los datos en el archivo JSON"""
-        datos = {
-            'transacciones': self.transacciones,
-            'meta_ahorro': self.meta_ahorro
-        }
-        with open(self.archivo, 'w', encoding='utf-8') as f:
-            json.dump(datos, f, indent=2, ensure_ascii=False)
+        """Guarda todo de una vez compactando el diario"""
+        self.compactar()
     
     def agregar_transaccion(self):
         """Agregar una nueva transacción"""
@@ -86,27 +249,87 @@ class ControlFinanciero:
             print("❌ Opción inválida")
             return
         
-        # Crear transacción
-        transaccion = {
-            'id': len(self.transacciones) + 1,
+        self.registrar_transaccion(tipo, descripcion, monto, categoria)
+        print(f"\n✅ Transacción agregada exitosamente")
+    
+    def crear_transaccion(self, tipo, descripcion, monto, categoria, fecha=None):
+        """Arma la transacción reservando el siguiente ID"""
+        self.siguiente_id += 1
+        return {
+            'id': self.siguiente_id - 1,
             'tipo': tipo,
             'descripcion': descripcion,
             'monto': round(monto, 2),
             'categoria': categoria,
-            'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'fecha': fecha or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
+    
+    def registrar_transaccion(self, tipo, descripcion, monto, categoria, fecha=None):
+        """Agrega una transacción sin preguntar nada y la guarda"""
+        transaccion = self.crear_transaccion(tipo, descripcion, monto, categoria, fecha)
+        self.transacciones[transaccion['id']] = transaccion
+        self.sumar_a_totales(transaccion, 1)
+        self.anotar({'op': 'agregar', 'transaccion': transaccion})
+        return transaccion
+    
+    def registrar_transacciones(self, transacciones):
+        """Agrega varias transacciones (dicts con tipo, descripcion, monto, categoria y fecha opcional) con una sola escritura"""
+        nuevas = []
+        for t in transacciones:
+            transaccion = self.crear_transaccion(t['tipo'], t['descripcion'], t['monto'],
+                                                 t['categoria'], t.get('fecha'))
+            self.transacciones[transaccion['id']] = transaccion
+            self.sumar_a_totales(transaccion, 1)
+            nuevas.append(transaccion)
+        self.anotar(*({'op': 'agregar', 'transaccion': t} for t in nuevas))
+        return nuevas
+    
+    def buscar_transaccion(self, id_transaccion):
+        return self.transacciones.get(id_transaccion)
+    
+    def editar_transaccion(self, id_transaccion, cambios):
+        """Cambia campos de una transacción; False si el ID no existe.
         
-        self.transacciones.append(transaccion)
-        self.guardar_datos()
-        print(f"\n✅ Transacción agregada exitosamente")
+        Lanza ValueError si cambios trae el id, un campo desconocido o un valor del tipo equivocado.
+        """
+        revisar_campos(cambios, CAMPOS_EDITABLES)
+        transaccion = self.buscar_transaccion(id_transaccion)
+        if transaccion is None:
+            return False
+        self.sumar_a_totales(transaccion, -1)
+        transaccion.update(cambios)
+        self.sumar_a_totales(transaccion, 1)
+        self.anotar({'op': 'editar', 'id': id_transaccion, 'cambios': cambios})
+        return True
+    
+    def quitar_transaccion(self, id_transaccion):
+        """Elimina la transacción sin preguntar; devuelve la eliminada o None si el ID no existe"""
+        t = self.transacciones.pop(id_transaccion, None)
+        if t is not None:
+            self.sumar_a_totales(t, -1)
+            self.anotar({'op': 'eliminar', 'id': id_transaccion})
+        return t
+    
+    def filtrar_por_categoria(self, categoria):
+        return [t for t in self.transacciones.values() if t['categoria'] == categoria]
     
     def calcular_totales(self):
         """Calcula ingresos, gastos y balance"""
-        ingresos = sum(t['monto'] for t in self.transacciones if t['tipo'] == 'ingreso')
-        gastos = sum(t['monto'] for t in self.transacciones if t['tipo'] == 'gasto')
+        ingresos = self.totales_tipo['ingreso'] / 100
+        gastos = self.totales_tipo['gasto'] / 100
         balance = ingresos - gastos
         return ingresos, gastos, balance
     
+    def gastos_por_categoria(self):
+        """Categoría -> total gastado, solo las que tienen gastos"""
+        return {categoria: centavos / 100 for (tipo, categoria), centavos in self.totales_categoria.items()
+                if tipo == 'gasto' and centavos}
+    
+    def totales_del_mes(self, mes=None):
+        """(ingresos, gastos) del mes 'aaaa-mm'; por defecto el actual"""
+        mes = mes or datetime.now().strftime('%Y-%m')
+        return self.totales_mes[(mes, 'ingreso')] / 100, self.totales_mes[(mes, 'gasto')] / 100
+    
     def ver_resumen(self):
         """Muestra el resumen financiero"""
         print("\n" + "="*50)
@@ -120,6 +343,10 @@ class ControlFinanciero:
         print("-" * 50)
         print(f"{'Balance:':<25} ${balance:>15,.2f}")
         
+        ingresos_mes, gastos_mes = self.totales_del_mes()
+        print(f"\n{'Ingresos del mes:':<25} ${ingresos_mes:>15,.2f}")
+        print(f"{'Gastos del mes:':<25} ${gastos_mes:>15,.2f}")
+        
         # Progreso de meta de ahorro
         if self.meta_ahorro > 0:
             progreso = (balance / self.meta_ahorro) * 100
@@ -138,10 +365,7 @@ class ControlFinanciero:
         print("📊 GASTOS POR CATEGORÍA")
         print("="*50)
         
-        gastos_cat = defaultdict(float)
-        for t in self.transacciones:
-            if t['tipo'] == 'gasto':
-                gastos_cat[t['categoria']] += t['monto']
+        gastos_cat = self.gastos_por_categoria()
         
         if not gastos_cat:
             print("\nNo hay gastos registrados")
@@ -173,8 +397,7 @@ class ControlFinanciero:
             return
         
         # Mostrar las últimas 20 transacciones
-        transacciones_recientes = self.transacciones[-20:]
-        transacciones_recientes.reverse()
+        transacciones_recientes = islice(reversed(self.transacciones.values()), 20)
         
         for t in transacciones_recientes:
             signo = "+" if t['tipo'] == 'ingreso' else "-"
@@ -198,18 +421,17 @@ class ControlFinanciero:
         try:
             id_eliminar = int(input("\nIngresa el ID de la transacción a eliminar: ").strip())
             
-            for i, t in enumerate(self.transacciones):
-                if t['id'] == id_eliminar:
-                    confirmacion = input(f"\n¿Eliminar '{t['descripcion']}' (${t['monto']:.2f})? (s/n): ").strip().lower()
-                    if confirmacion == 's':
-                        self.transacciones.pop(i)
-                        self.guardar_datos()
-                        print("✅ Transacción eliminada")
-                    else:
-                        print("❌ Operación cancelada")
-                    return
+            t = self.buscar_transaccion(id_eliminar)
+            if t is None:
+                print("❌ ID no encontrado")
+                return
             
-            print("❌ ID no encontrado")
+            confirmacion = input(f"\n¿Eliminar '{t['descripcion']}' (${t['monto']:.2f})? (s/n): ").strip().lower()
+            if confirmacion == 's':
+                self.quitar_transaccion(id_eliminar)
+                print("✅ Transacción eliminada")
+            else:
+                print("❌ Operación cancelada")
         except ValueError:
             print("❌ ID inválido")
     
@@ -228,7 +450,7 @@ class ControlFinanciero:
                 return
             
             self.meta_ahorro = round(nueva_meta, 2)
-            self.guardar_datos()
+            self.anotar({'op': 'meta', 'meta_ahorro': self.meta_ahorro})
             print(f"✅ Meta establecida en ${self.meta_ahorro:,.2f}")
         except ValueError:
             print("❌ Monto inválido")
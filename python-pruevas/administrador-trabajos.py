@@ -1,47 +1,94 @@
-import pandas as pd
 import random
-import string
+import sqlite3
+import threading
+from collections import Counter
 from datetime import datetime
 import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-from tkcalendar import DateEntry
 
-class RegistroTrabajos:
-    def __init__(self, archivo='registro-trabajos-escolares.xlsx'):
-        self.archivo = archivo
-        self.codigos_usados = set()
-        self.cargar_datos()
+from registro_base import (
+    parsear_fecha, parsear_fechas, fechas_o_texto,
+    AlmacenExcel, HistorialCambios, AsignadorCodigosBase, RegistroBase, importar_diferido
+)
+from ventana_registro import VentanaRegistro, iniciar
+
+# Se importan al construir la interfaz o en el primer acceso a los datos
+pd = importar_diferido('pandas')
+np = importar_diferido('numpy')
+tkcalendar = importar_diferido('tkcalendar')
+
+# Valores conocidos de los combos; también son las categorías de las columnas
+MATERIAS = ['Matemáticas', 'Español', 'Inglés', 'Ciencias', 
+            'Historia', 'Geografía', 'Educación Física', 'Arte', 'Informática', 'Otra']
+GRADOS = ['1°', '2°', '3°', '4°', '5°', '6°', '7°', '8°', '9°', '10°', '11°', 'Otro']
+CALIFICACIONES = ['N/A', 'Excelente', 'Bueno', 'Satisfactorio', 'Deficiente', 'Por Calificar']
+ESTADOS = ['No echo', 'En Progreso', 'Echo', 'Entregado', 'Revisado', 'Calificado']
+# Colores de la tabla por estado; los que no están usan 'calificado'
+TAGS_ESTADO = {'No echo': 'no_echo', 'En Progreso': 'en_progreso',
+               'Echo': 'echo', 'Entregado': 'entregado'}
+# Puntos de cada calificación para los promedios; 'N/A' y 'Por Calificar' no cuentan
+PUNTOS_CALIFICACION = {'Excelente': 4, 'Bueno': 3, 'Satisfactorio': 2, 'Deficiente': 1}
+# Estados en los que el trabajo ya se entregó; los demás cuentan como vencidos tras la fecha de entrega
+ESTADOS_COMPLETADOS = ['Entregado', 'Revisado', 'Calificado']
+
+class RegistroTrabajos(RegistroBase):
+    ARCHIVO = 'registro-trabajos-escolares.xlsx'
+    COLUMNAS = [
+        'Codigo', 'Materia', 'Titulo Trabajo', 'Estudiante', 'Grado',
+        'Profesor', 'Fecha Asignacion', 'Fecha Entrega', 'Calificacion',
+        'Estado', 'Descripcion', 'Observaciones'
+    ]
+    COLUMNAS_CATEGORICAS = {
+        'Materia': MATERIAS,
+        'Grado': GRADOS,
+        'Profesor': None,
+        'Calificacion': CALIFICACIONES,
+        'Estado': ESTADOS
+    }
+    COLUMNAS_FECHA = ['Fecha Asignacion', 'Fecha Entrega']
+    COLUMNAS_TEXTO = ['Estudiante', 'Titulo Trabajo', 'Descripcion']
+    COLUMNAS_FILTRO = {'materia': 'Materia', 'estado': 'Estado', 'estudiante': 'Estudiante'}
+    COLUMNA_FECHA_INDEXADA = 'Fecha Entrega'
     
-    def cargar_datos(self):
-        if os.path.exists(self.archivo):
-            try:
-                self.df = pd.read_excel(self.archivo)
-                self.codigos_usados = set(self.df['Codigo'].tolist())
-            except PermissionError:
-                raise PermissionError(
-                    f"El archivo '{self.archivo}' está abierto en otro programa.\n"
-                    "Por favor ciérralo y vuelve a intentar."
-                )
-        else:
-            self.df = pd.DataFrame(columns=[
-                'Codigo', 'Materia', 'Titulo Trabajo', 'Estudiante', 'Grado',
-                'Profesor', 'Fecha Asignacion', 'Fecha Entrega', 'Calificacion',
-                'Estado', 'Descripcion', 'Observaciones'
-            ])
+    def __init__(self, archivo=None, almacen=None, en_segundo_plano=False):
+        self._resumen = None
+        super().__init__(archivo, almacen, en_segundo_plano)
     
-    def generar_codigo(self):
-        while True:
-            codigo = ''.join(random.choices(
-                string.ascii_uppercase + string.digits, k=8
-                
-            ))
-            if codigo not in self.codigos_usados:
-                self.codigos_usados.add(codigo)
-                return codigo
+    def entregas_entre(self, desde=None, hasta=None, pendientes=False):
+        """Trabajos con Fecha Entrega entre desde y hasta (los dos días incluidos), ordenados por fecha.
+        
+        Las fechas pueden ser texto dd/mm/aaaa o Timestamp; None deja el extremo abierto.
+        Con pendientes solo se devuelven los que aún no se entregaron.
+        """
+        desde = None if desde is None else parsear_fecha(desde).normalize()
+        antes_de = None if hasta is None else parsear_fecha(hasta).normalize() + pd.Timedelta(days=1)
+        with self.cerrojo:
+            etiquetas = self.fechas_indexadas().entre(desde, antes_de)
+            df = self.df.loc[etiquetas]
+        if pendientes:
+            df = df[~df['Estado'].isin(ESTADOS_COMPLETADOS)]
+        return df
     
-    def agregar_registro(self, materia, titulo, estudiante, grado, profesor, 
-                        fecha_asignacion, fecha_entrega, calificacion, 
+    def proximas_entregas(self, dias=7):
+        """Trabajos pendientes que se entregan desde hoy hasta dentro de dias días"""
+        hoy = pd.Timestamp.today().normalize()
+        return self.entregas_entre(hoy, hoy + pd.Timedelta(days=dias), pendientes=True)
+    
+    def vencidos(self):
+        """Trabajos con la fecha de entrega pasada que aún no se entregaron"""
+        ayer = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+        return self.entregas_entre(None, ayer, pendientes=True)
+    
+    def resumen(self):
+        """Promedios, avance por materia y vencidos, que se mantienen al día con cada cambio"""
+        if self._resumen is None:
+            self._resumen = ResumenTrabajos(self)
+        return self._resumen
+    
+    def agregar_registro(self, materia, titulo, estudiante, grado, profesor,
+                        fecha_asignacion, fecha_entrega, calificacion,
                         estado, descripcion, observaciones=''):
         codigo = self.generar_codigo()
         
@@ -60,100 +107,618 @@ class RegistroTrabajos:
             'Observaciones': observaciones
         }
         
-        self.df = pd.concat([self.df, pd.DataFrame([nuevo_registro])], 
-                           ignore_index=True)
-        self.guardar()
+        self.registrar_cambio('agregar', codigo, nuevo_registro)
         return codigo
     
     def cambiar_estado(self, codigo, nuevo_estado):
-        indice = self.df[self.df['Codigo'] == codigo].index
-        if len(indice) == 0:
+        return self.editar(codigo, {'Estado': nuevo_estado})
+    
+    def actualizar_calificacion(self, codigo, calificacion):
+        return self.editar(codigo, {'Calificacion': calificacion})
+    
+    def filtrar_por_estado(self, estado):
+        return self.df[self.df['Estado'] == estado]
+    
+    def filtrar_por_materia(self, materia):
+        return self.df[self.df['Materia'] == materia]
+    
+    def filtrar_por_estudiante(self, estudiante):
+        return self.df[self.df['Estudiante'] == estudiante]
+
+class AsignadorCodigosSQLite(AsignadorCodigosBase):
+    """Los mismos códigos, con el contador en una tabla de la base"""
+    
+    def __init__(self, conexion):
+        super().__init__()
+        self.conexion = conexion
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS contador_codigos (siguiente INTEGER, clave INTEGER)"
+        )
+        if self.conexion.execute("SELECT COUNT(*) FROM contador_codigos").fetchone()[0] == 0:
+            self.conexion.execute(
+                "INSERT INTO contador_codigos VALUES (0, ?)",
+                (random.SystemRandom().getrandbits(62),)
+            )
+    
+    def reservar(self, cantidad):
+        # Un solo UPDATE es atómico entre procesos; RETURNING da el valor ya sumado
+        with self.conexion:
+            fin, clave = self.conexion.execute(
+                "UPDATE contador_codigos SET siguiente = siguiente + ? RETURNING siguiente, clave",
+                (cantidad,)
+            ).fetchone()
+        return fin - cantidad, fin, clave
+
+class RegistroTrabajosSQLite:
+    """Misma interfaz que RegistroTrabajos pero guardando en una base SQLite con índices.
+    
+    Las etiquetas de fila son el rowid de SQLite. Si la base no existe y hay un libro
+    de Excel con el mismo nombre, se importa al crearla.
+    
+    Las fechas se guardan como texto aaaa-mm-dd, vengan del DateEntry o del libro:
+    así se ordenan como texto y el índice de Fecha Entrega sirve para los rangos.
+    Las consultas las devuelven como datetime64, igual que RegistroTrabajos.
+    """
+    COLUMNAS = RegistroTrabajos.COLUMNAS
+    COLUMNAS_FECHA = RegistroTrabajos.COLUMNAS_FECHA
+    COLUMNAS_INDEXADAS = ['Estado', 'Materia', 'Estudiante', 'Fecha Entrega']
+    COLUMNAS_TEXTO = RegistroTrabajos.COLUMNAS_TEXTO
+    COLUMNAS_FILTRO = RegistroTrabajos.COLUMNAS_FILTRO
+    FORMATO_FECHA_BASE = '%Y-%m-%d'
+    # Lo que no encaja es texto viejo que no es fecha
+    PATRON_FECHA = '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+    # PRAGMA user_version: 1 = fechas en aaaa-mm-dd
+    VERSION_ESQUEMA = 1
+    # obtener_todos consulta la tabla entera: la vista se mantiene al día fila por fila con buscar
+    EN_MEMORIA = False
+    
+    def __init__(self, archivo='registro-trabajos-escolares.db', libro=None):
+        self.archivo = archivo
+        self.libro = libro if libro is not None else os.path.splitext(archivo)[0] + '.xlsx'
+        self.observadores = []
+        self._resumen = None
+        self.historial = HistorialCambios()
+        self.lectores = threading.local()
+        # La base se abre al momento; no hay carga en segundo plano que esperar
+        self.cargado = threading.Event()
+        self.cargado.set()
+        self.error_carga = None
+        self.cargar_datos()
+    
+    def cargar_datos(self):
+        nueva = not os.path.exists(self.archivo)
+        self.conexion = sqlite3.connect(self.archivo)
+        self.hilo = threading.get_ident()
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        columnas = ', '.join(
+            f'"{columna}" TEXT PRIMARY KEY' if columna == 'Codigo' else f'"{columna}" TEXT'
+            for columna in self.COLUMNAS
+        )
+        # Sin WITHOUT ROWID: el rowid es la etiqueta estable de cada fila
+        self.conexion.execute(f"CREATE TABLE IF NOT EXISTS trabajos ({columnas})")
+        self.migrar_fechas()
+        for columna in self.COLUMNAS_INDEXADAS:
+            self.conexion.execute(
+                f'CREATE INDEX IF NOT EXISTS "idx_{columna}" ON trabajos ("{columna}")'
+            )
+        self.busqueda_texto = self.crear_indice_texto()
+        self.version_datos = self.conexion.execute("PRAGMA data_version").fetchone()[0]
+        self.asignador = AsignadorCodigosSQLite(self.conexion)
+        self.conexion.commit()
+        
+        if nueva and os.path.exists(self.libro):
+            df = RegistroTrabajos(self.libro, almacen=AlmacenExcel(self.libro)).obtener_todos()
+            self.insertar(df.to_dict('records'))
+            self.conexion.commit()
+    
+    def migrar_fechas(self):
+        """Pasa a aaaa-mm-dd las fechas de bases anteriores, guardadas como dd/mm/aaaa o 'aaaa-mm-dd 00:00:00'"""
+        if self.conexion.execute("PRAGMA user_version").fetchone()[0] >= self.VERSION_ESQUEMA:
+            return
+        # El índice sobre la expresión CASE que ordenaba los dos formatos ya no hace falta
+        self.conexion.execute("DROP INDEX IF EXISTS idx_fecha_entrega")
+        seleccion = ', '.join(f'"{columna}"' for columna in self.COLUMNAS_FECHA)
+        asignaciones = ', '.join(f'"{columna}" = ?' for columna in self.COLUMNAS_FECHA)
+        filas = self.conexion.execute(f"SELECT rowid, {seleccion} FROM trabajos").fetchall()
+        cambios = []
+        for etiqueta, *valores in filas:
+            nuevos = [self.valor_guardado(columna, valor) for columna, valor in zip(self.COLUMNAS_FECHA, valores)]
+            if nuevos != valores:
+                cambios.append(nuevos + [etiqueta])
+        self.conexion.executemany(f"UPDATE trabajos SET {asignaciones} WHERE rowid = ?", cambios)
+        self.conexion.execute(f"PRAGMA user_version = {self.VERSION_ESQUEMA}")
+    
+    def valor_guardado(self, columna, valor):
+        """Valor como va a la base: texto, NULL para vacíos y las fechas en aaaa-mm-dd"""
+        if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+            return None
+        if columna in self.COLUMNAS_FECHA:
+            fecha = parsear_fecha(valor)
+            if not pd.isna(fecha):
+                return fecha.strftime(self.FORMATO_FECHA_BASE)
+        return str(valor)
+    
+    def crear_indice_texto(self):
+        """Tabla FTS5 de trigramas para que LIKE '%texto%' no recorra toda la tabla.
+        
+        Devuelve False si el SQLite instalado no trae FTS5; entonces se usa LIKE directo.
+        """
+        existia = self.conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'trabajos_texto'"
+        ).fetchone()
+        columnas = ', '.join(f'"{columna}"' for columna in self.COLUMNAS_TEXTO)
+        nuevos = ', '.join(f'new."{columna}"' for columna in self.COLUMNAS_TEXTO)
+        viejos = ', '.join(f'old."{columna}"' for columna in self.COLUMNAS_TEXTO)
+        try:
+            self.conexion.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS trabajos_texto USING fts5({columnas}, "
+                "content='trabajos', content_rowid='rowid', tokenize='trigram')"
+            )
+        except sqlite3.OperationalError:
             return False
-        
-        self.df.loc[indice, 'Estado'] = nuevo_estado
-        self.guardar()
+        # Los disparadores mantienen la tabla de texto al día con cada cambio
+        self.conexion.executescript(f"""
+            CREATE TRIGGER IF NOT EXISTS trabajos_texto_ai AFTER INSERT ON trabajos BEGIN
+                INSERT INTO trabajos_texto (rowid, {columnas}) VALUES (new.rowid, {nuevos});
+            END;
+            CREATE TRIGGER IF NOT EXISTS trabajos_texto_ad AFTER DELETE ON trabajos BEGIN
+                INSERT INTO trabajos_texto (trabajos_texto, rowid, {columnas})
+                VALUES ('delete', old.rowid, {viejos});
+            END;
+            CREATE TRIGGER IF NOT EXISTS trabajos_texto_au AFTER UPDATE ON trabajos BEGIN
+                INSERT INTO trabajos_texto (trabajos_texto, rowid, {columnas})
+                VALUES ('delete', old.rowid, {viejos});
+                INSERT INTO trabajos_texto (rowid, {columnas}) VALUES (new.rowid, {nuevos});
+            END;
+        """)
+        if not existia:
+            # Bases creadas antes de la búsqueda por texto
+            self.conexion.execute("INSERT INTO trabajos_texto (trabajos_texto) VALUES ('rebuild')")
         return True
     
-    def actualizar_calificacion(self, codigo, calificacion):
-        indice = self.df[self.df['Codigo'] == codigo].index
-        if len(indice) == 0:
+    def conexion_actual(self):
+        """Conexión para el hilo que llama; con WAL las lecturas de otro hilo no bloquean"""
+        if threading.get_ident() == self.hilo:
+            return self.conexion
+        conexion = getattr(self.lectores, 'conexion', None)
+        if conexion is None:
+            conexion = self.lectores.conexion = sqlite3.connect(self.archivo)
+        return conexion
+    
+    def consultar(self, where='', parametros=(), orden='rowid'):
+        consulta = f"SELECT rowid AS etiqueta, * FROM trabajos {where} ORDER BY {orden}"
+        df = pd.read_sql_query(consulta, self.conexion_actual(), params=parametros, index_col='etiqueta')
+        df.index.name = None
+        for columna in self.COLUMNAS_FECHA:
+            df[columna] = fechas_o_texto(df[columna], self.FORMATO_FECHA_BASE)
+        return df
+    
+    def insertar(self, registros):
+        columnas = ', '.join(f'"{columna}"' for columna in self.COLUMNAS)
+        marcas = ', '.join('?' for _ in self.COLUMNAS)
+        cursor = self.conexion.cursor()
+        etiquetas = []
+        for registro in registros:
+            valores = [self.valor_guardado(columna, registro.get(columna)) for columna in self.COLUMNAS]
+            cursor.execute(f"INSERT INTO trabajos ({columnas}) VALUES ({marcas})", valores)
+            etiquetas.append(cursor.lastrowid)
+        return etiquetas
+    
+    def suscribir(self, funcion):
+        """funcion recibe una lista de (operacion, codigo, etiqueta) tras cada cambio"""
+        self.observadores.append(funcion)
+    
+    def resumen(self):
+        """Promedios, avance por materia y vencidos, que se mantienen al día con cada cambio"""
+        if self._resumen is None:
+            self._resumen = ResumenTrabajos(self)
+        return self._resumen
+    
+    def notificar(self, cambios):
+        for funcion in self.observadores:
+            funcion(cambios)
+    
+    def etiqueta(self, codigo):
+        fila = self.conexion.execute(
+            "SELECT rowid FROM trabajos WHERE Codigo = ?", (codigo,)
+        ).fetchone()
+        return None if fila is None else fila[0]
+    
+    def generar_codigo(self):
+        while True:
+            codigo = self.asignador.siguiente_codigo()
+            # Las bases importadas de un libro tienen códigos al azar que podrían coincidir
+            if self.etiqueta(codigo) is None:
+                return codigo
+    
+    def agregar_registro(self, materia, titulo, estudiante, grado, profesor, 
+                        fecha_asignacion, fecha_entrega, calificacion, 
+                        estado, descripcion, observaciones=''):
+        return self.agregar_registros([{
+            'Materia': materia,
+            'Titulo Trabajo': titulo,
+            'Estudiante': estudiante,
+            'Grado': grado,
+            'Profesor': profesor,
+            'Fecha Asignacion': fecha_asignacion,
+            'Fecha Entrega': fecha_entrega,
+            'Calificacion': calificacion,
+            'Estado': estado,
+            'Descripcion': descripcion,
+            'Observaciones': observaciones
+        }])[0]
+    
+    def agregar_registros(self, registros):
+        """Agrega muchos registros en una sola transacción"""
+        registros = list(registros)
+        self.asignador.preparar(len(registros))
+        nuevos = []
+        for registro in registros:
+            nuevo_registro = {columna: registro.get(columna, '') for columna in self.COLUMNAS}
+            nuevo_registro['Codigo'] = self.generar_codigo()
+            nuevos.append(nuevo_registro)
+        
+        with self.conexion:
+            etiquetas = self.insertar(nuevos)
+        codigos = [registro['Codigo'] for registro in nuevos]
+        if codigos:
+            self.historial.anotar([('agregar', registro['Codigo'], registro) for registro in nuevos],
+                                  [('eliminar', codigo, None) for codigo in codigos])
+            self.notificar([('agregar', codigo, etiqueta) for codigo, etiqueta in zip(codigos, etiquetas)])
+        return codigos
+    
+    def valores_fila(self, etiqueta, columnas):
+        """Valores guardados de una fila, para poder volver a escribirlos al deshacer"""
+        seleccion = ', '.join(f'"{columna}"' for columna in columnas)
+        fila = self.conexion.execute(f"SELECT {seleccion} FROM trabajos WHERE rowid = ?", (etiqueta,)).fetchone()
+        return dict(zip(columnas, fila))
+    
+    def editar(self, codigo, cambios):
+        etiqueta = self.etiqueta(codigo)
+        if etiqueta is None:
             return False
         
-        self.df.loc[indice, 'Calificacion'] = calificacion
-        self.guardar()
+        anteriores = self.valores_fila(etiqueta, list(cambios))
+        asignaciones = ', '.join(f'"{columna}" = ?' for columna in cambios)
+        with self.conexion:
+            self.conexion.execute(
+                f"UPDATE trabajos SET {asignaciones} WHERE rowid = ?",
+                [self.valor_guardado(columna, valor) for columna, valor in cambios.items()] + [etiqueta]
+            )
+        self.historial.anotar([('actualizar', codigo, cambios)], [('actualizar', codigo, anteriores)])
+        self.notificar([('actualizar', codigo, etiqueta)])
+        return True
+    
+    def aplicar_operaciones(self, operaciones):
+        """Aplica una lista de cambios en una sola transacción, sin anotarla en el historial"""
+        eventos = []
+        with self.conexion:
+            for operacion, codigo, datos in operaciones:
+                etiqueta = self.etiqueta(codigo)
+                if operacion == 'agregar' and etiqueta is None:
+                    etiqueta = self.insertar([datos])[0]
+                elif operacion == 'eliminar' and etiqueta is not None:
+                    self.conexion.execute("DELETE FROM trabajos WHERE rowid = ?", (etiqueta,))
+                elif etiqueta is not None:
+                    # Los valores vienen de la base: None vuelve a ser NULL
+                    asignaciones = ', '.join(f'"{columna}" = ?' for columna in datos)
+                    self.conexion.execute(
+                        f"UPDATE trabajos SET {asignaciones} WHERE rowid = ?",
+                        [self.valor_guardado(columna, valor) for columna, valor in datos.items()] + [etiqueta]
+                    )
+                else:
+                    continue
+                eventos.append((operacion, codigo, etiqueta))
+        if eventos:
+            self.notificar(eventos)
+    
+    def deshacer(self):
+        operaciones = self.historial.sacar_para_deshacer()
+        if operaciones is None:
+            return False
+        self.aplicar_operaciones(operaciones)
         return True
     
+    def rehacer(self):
+        operaciones = self.historial.sacar_para_rehacer()
+        if operaciones is None:
+            return False
+        self.aplicar_operaciones(operaciones)
+        return True
+    
+    def cambiar_estado(self, codigo, nuevo_estado):
+        return self.editar(codigo, {'Estado': nuevo_estado})
+    
+    def actualizar_calificacion(self, codigo, calificacion):
+        return self.editar(codigo, {'Calificacion': calificacion})
+    
+    def editar_lote(self, codigos, cambios):
+        """Aplica los mismos cambios a varios registros en una sola transacción"""
+        asignaciones = ', '.join(f'"{columna}" = ?' for columna in cambios)
+        valores = [self.valor_guardado(columna, valor) for columna, valor in cambios.items()]
+        eventos = []
+        inversos = []
+        with self.conexion:
+            for codigo in dict.fromkeys(codigos):
+                etiqueta = self.etiqueta(codigo)
+                if etiqueta is None:
+                    continue
+                inversos.append(('actualizar', codigo, self.valores_fila(etiqueta, list(cambios))))
+                self.conexion.execute(
+                    f"UPDATE trabajos SET {asignaciones} WHERE rowid = ?", valores + [etiqueta]
+                )
+                eventos.append(('actualizar', codigo, etiqueta))
+        if eventos:
+            self.historial.anotar([('actualizar', codigo, cambios) for _, codigo, _ in eventos], inversos)
+            self.notificar(eventos)
+        return [codigo for _, codigo, _ in eventos]
+    
     def eliminar(self, codigo):
-        indice = self.df[self.df['Codigo'] == codigo].index
-        if len(indice) == 0:
+        etiqueta = self.etiqueta(codigo)
+        if etiqueta is None:
             return False
         
-        self.df = self.df.drop(indice)
-        self.codigos_usados.discard(codigo)
-        self.guardar()
+        anteriores = self.valores_fila(etiqueta, self.COLUMNAS)
+        with self.conexion:
+            self.conexion.execute("DELETE FROM trabajos WHERE rowid = ?", (etiqueta,))
+        self.historial.anotar([('eliminar', codigo, None)], [('agregar', codigo, anteriores)])
+        self.notificar([('eliminar', codigo, etiqueta)])
         return True
     
     def buscar(self, codigo):
-        resultado = self.df[self.df['Codigo'] == codigo]
+        resultado = self.consultar("WHERE Codigo = ?", (codigo,))
         if len(resultado) == 0:
             return None
         return resultado
     
     def obtener_todos(self):
-        return self.df
+        return self.consultar()
+    
+    def filtrar(self, cancelado=None, **filtros):
+        """Los mismos filtros que RegistroBase.filtrar, como una consulta"""
+        desconocidos = set(filtros) - set(self.COLUMNAS_FILTRO)
+        if desconocidos:
+            raise TypeError(f"Filtros desconocidos: {', '.join(sorted(desconocidos))}")
+        # Los índices de SQLite hacen el trabajo; solo se puede cancelar antes de consultar
+        if cancelado is not None and cancelado():
+            return None
+        condiciones = []
+        parametros = []
+        for nombre, columna in self.COLUMNAS_FILTRO.items():
+            valor = filtros.get(nombre)
+            if not valor:
+                continue
+            if columna not in self.COLUMNAS_TEXTO:
+                condiciones.append(f'"{columna}" = ?')
+                parametros.append(valor)
+                continue
+            if self.busqueda_texto:
+                condiciones.append(
+                    f'rowid IN (SELECT rowid FROM trabajos_texto WHERE "{columna}" LIKE ?)'
+                )
+            else:
+                condiciones.append(f'"{columna}" LIKE ?')
+            parametros.append(f"%{valor}%")
+        where = "WHERE " + " AND ".join(condiciones) if condiciones else ''
+        return self.consultar(where, parametros)
     
     def filtrar_por_estado(self, estado):
-        return self.df[self.df['Estado'] == estado]
+        return self.consultar("WHERE Estado = ?", (estado,))
+    
+    def entregas_entre(self, desde=None, hasta=None, pendientes=False):
+        """Trabajos con Fecha Entrega entre desde y hasta (los dos días incluidos), ordenados por fecha"""
+        fecha = '"Fecha Entrega"'
+        # Deja fuera las fechas vacías y los textos que no son fechas
+        condiciones = [f"{fecha} GLOB ?"]
+        parametros = [self.PATRON_FECHA]
+        if desde is not None:
+            condiciones.append(f"{fecha} >= ?")
+            parametros.append(parsear_fecha(desde).strftime(self.FORMATO_FECHA_BASE))
+        if hasta is not None:
+            condiciones.append(f"{fecha} <= ?")
+            parametros.append(parsear_fecha(hasta).strftime(self.FORMATO_FECHA_BASE))
+        if pendientes:
+            marcas = ', '.join('?' for _ in ESTADOS_COMPLETADOS)
+            condiciones.append(f"(Estado IS NULL OR Estado NOT IN ({marcas}))")
+            parametros.extend(ESTADOS_COMPLETADOS)
+        return self.consultar("WHERE " + " AND ".join(condiciones), parametros, orden=f"{fecha}, rowid")
+    
+    def proximas_entregas(self, dias=7):
+        hoy = pd.Timestamp.today().normalize()
+        return self.entregas_entre(hoy, hoy + pd.Timedelta(days=dias), pendientes=True)
+    
+    def vencidos(self):
+        ayer = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+        return self.entregas_entre(None, ayer, pendientes=True)
     
     def filtrar_por_materia(self, materia):
-        return self.df[self.df['Materia'] == materia]
+        return self.consultar("WHERE Materia = ?", (materia,))
     
     def filtrar_por_estudiante(self, estudiante):
-        return self.df[self.df['Estudiante'] == estudiante]
+        return self.consultar("WHERE Estudiante = ?", (estudiante,))
+    
+    def exportar_excel(self, ruta=None):
+        """Escribe el registro en un libro de Excel para quien siga usando la hoja"""
+        ruta = ruta if ruta is not None else self.libro
+        AlmacenExcel(ruta).escribir(self.obtener_todos())
+        return ruta
+    
+    def revisar_cambios_externos(self):
+        """True si otro proceso escribió la base desde la última consulta"""
+        # data_version solo cambia con escrituras de otras conexiones
+        version = self.conexion.execute("PRAGMA data_version").fetchone()[0]
+        cambio, self.version_datos = version != self.version_datos, version
+        return cambio
     
     def guardar(self):
-        try:
-            self.df.to_excel(self.archivo, index=False)
-        except PermissionError:
-            raise PermissionError(
-                f"No se puede guardar '{self.archivo}'.\n"
-                "El archivo está abierto en otro programa. Ciérralo e intenta de nuevo."
-            )
+        self.conexion.commit()
+    
+    def errores_guardado(self):
+        return []
+    
+    def cerrar(self):
+        self.conexion.close()
 
-class VentanaPrincipal:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Sistema de Registro - Trabajos Escolares")
-        self.root.geometry("1100x700")
-        
-        # Estilos personalizados (paleta azul oscura, profesional)
-        self.style = ttk.Style()
-        try:
-            self.style.theme_use('clam')
-        except Exception:
-            pass
-        
-        # LabelFrame oscuro
-        self.style.configure('Blue.TLabelframe', background='#0b3d91')
-        self.style.configure('Blue.TLabelframe.Label', background='#0b3d91', foreground='#ffffff', font=('Arial', 11, 'bold'))
-        
-        # Labels dentro de los frames
-        self.style.configure('Blue.TLabel', background='#0b3d91', foreground='#ffffff', font=('Arial', 10))
-        
-        # Botones con azul más oscuro
-        self.style.configure('Blue.TButton', background='#0b57d0', foreground='#ffffff', font=('Arial', 10, 'bold'))
-        self.style.map('Blue.TButton', background=[('active', '#0844a8')], foreground=[('active', '#ffffff')])
-        
-        # Treeview encabezados
-        self.style.configure('Treeview.Heading', background='#0b57d0', foreground='#ffffff', font=('Arial', 10, 'bold'))
-        self.style.configure('Treeview', background='#ffffff', foreground='#000000', fieldbackground='#ffffff')
-        
-        self.sistema = RegistroTrabajos()
-        
-        self.crear_interfaz()
-        self.actualizar_tabla()
+class ResumenTrabajos:
+    """Promedios por estudiante, avance por materia y trabajos vencidos, guardados entre consultas.
+    
+    La primera consulta (o la primera tras una recarga o un cambio de día) los
+    calcula con groupby. Después cada cambio del registro solo resta la
+    contribución anterior de su fila y suma la nueva, así consultar sigue siendo
+    instantáneo aunque el registro sea grande.
+    """
+    # Con más cambios pendientes que esto sale más barato recalcular todo
+    MAXIMO_INCREMENTAL = 2000
+    
+    def __init__(self, registro):
+        self.registro = registro
+        self.lock = threading.Lock()
+        self.pendientes = []
+        # (recarga del registro, día) del último cálculo completo
+        self.calculado = None
+        registro.suscribir(self.al_cambiar)
+    
+    def al_cambiar(self, cambios):
+        # Solo se anotan; se aplican en la siguiente consulta
+        with self.lock:
+            self.pendientes.extend(cambios)
+    
+    def invalidar(self):
+        """El registro cambió sin avisar (p.ej. lo guardó otro proceso): se recalcula en la siguiente consulta"""
+        with self.lock:
+            self.calculado = None
+    
+    def contribuciones(self, df):
+        """Estudiante, puntos, materia, estado y si está vencido, como arreglos por fila"""
+        fechas = df['Fecha Entrega']
+        if not pd.api.types.is_datetime64_any_dtype(fechas):
+            fechas = parsear_fechas(fechas)
+        puntos = df['Calificacion'].map(PUNTOS_CALIFICACION).astype(float)
+        vencido = (fechas < self.hoy) & ~df['Estado'].isin(ESTADOS_COMPLETADOS)
+        return (df['Estudiante'].to_numpy(), puntos.to_numpy(), df['Materia'].to_numpy(),
+                df['Estado'].to_numpy(), vencido.to_numpy())
+    
+    def actualizar(self):
+        hoy = pd.Timestamp.today().normalize()
+        clave = (getattr(self.registro, 'publicaciones', 0), hoy)
+        with self.lock:
+            pendientes, self.pendientes = self.pendientes, []
+            if self.calculado != clave or len(pendientes) > self.MAXIMO_INCREMENTAL:
+                self.hoy = hoy
+                self.recalcular()
+                self.calculado = clave
+                return
+            for operacion, codigo, etiqueta in pendientes:
+                self.aplicar(operacion, codigo, etiqueta)
+    
+    def recalcular(self):
+        df = self.registro.obtener_todos()
+        estudiantes, puntos, materias, estados, vencidos = self.contribuciones(df)
+        tabla = pd.DataFrame({'Estudiante': estudiantes, 'Puntos': puntos, 'Materia': materias,
+                              'Estado': estados, 'Vencido': vencidos})
+        sumas = tabla.groupby('Estudiante', observed=True)['Puntos'].agg(['sum', 'count'])
+        self.por_estudiante = {estudiante: [suma, cantidad] for estudiante, suma, cantidad
+                               in zip(sumas.index, sumas['sum'], sumas['count'])}
+        self.por_materia = Counter(tabla.groupby(['Materia', 'Estado'], observed=True).size().to_dict())
+        self.vencidos = Counter(tabla.loc[tabla['Vencido'], 'Materia'].value_counts().to_dict())
+        # Contribución de cada fila, para poder restarla cuando cambie
+        self.filas = dict(zip(df.index, zip(estudiantes, puntos, materias, estados, vencidos)))
+    
+    def aplicar(self, operacion, codigo, etiqueta):
+        anterior = self.filas.pop(etiqueta, None)
+        if anterior is not None:
+            self.sumar(anterior, -1)
+        if operacion == 'eliminar':
+            return
+        fila = self.registro.buscar(codigo)
+        if fila is not None:
+            nueva = self.contribucion(fila.iloc[0])
+            self.filas[etiqueta] = nueva
+            self.sumar(nueva, 1)
+    
+    def contribucion(self, fila):
+        """Lo mismo que contribuciones para una sola fila, sin pasar por pandas"""
+        fecha = parsear_fecha(fila['Fecha Entrega'])
+        estado = fila['Estado']
+        vencido = not pd.isna(fecha) and fecha < self.hoy and estado not in ESTADOS_COMPLETADOS
+        return (fila['Estudiante'], float(PUNTOS_CALIFICACION.get(fila['Calificacion'], np.nan)),
+                fila['Materia'], estado, vencido)
+    
+    def sumar(self, contribucion, signo):
+        estudiante, puntos, materia, estado, vencido = contribucion
+        if not pd.isna(estudiante) and not pd.isna(puntos):
+            acumulado = self.por_estudiante.setdefault(estudiante, [0.0, 0])
+            acumulado[0] += signo * puntos
+            acumulado[1] += signo
+        if not pd.isna(materia):
+            if not pd.isna(estado):
+                self.por_materia[(materia, estado)] += signo
+            if vencido:
+                self.vencidos[materia] += signo
+    
+    def promedios_por_estudiante(self):
+        """Estudiante, trabajos calificados y promedio (Deficiente=1 ... Excelente=4)"""
+        self.actualizar()
+        filas = [(estudiante, cantidad, suma / cantidad)
+                 for estudiante, (suma, cantidad) in self.por_estudiante.items() if cantidad > 0]
+        df = pd.DataFrame(filas, columns=['Estudiante', 'Calificados', 'Promedio'])
+        return df.sort_values('Estudiante', ignore_index=True)
+    
+    def avance_por_materia(self):
+        """Trabajos de cada materia por Estado, total, porcentaje completado y vencidos"""
+        self.actualizar()
+        conteos = {clave: cantidad for clave, cantidad in self.por_materia.items() if cantidad}
+        if conteos:
+            tabla = pd.Series(conteos).unstack(fill_value=0)
+        else:
+            tabla = pd.DataFrame(index=pd.Index([], name='Materia'))
+        otros = sorted(set(tabla.columns) - set(ESTADOS))
+        tabla = tabla.reindex(columns=ESTADOS + otros, fill_value=0)
+        tabla['Total'] = tabla.sum(axis=1)
+        completados = tabla[ESTADOS_COMPLETADOS].sum(axis=1)
+        tabla['% Completado'] = (100 * completados / tabla['Total']).round(1)
+        tabla['Vencidos'] = pd.Series(self.vencidos, dtype=int).reindex(tabla.index, fill_value=0)
+        tabla.index.name = 'Materia'
+        return tabla.reset_index()
+    
+    def vencidos_por_materia(self):
+        """Trabajos con la fecha de entrega pasada que aún no se entregaron, por materia"""
+        self.actualizar()
+        vencidos = pd.Series({materia: cantidad for materia, cantidad in self.vencidos.items() if cantidad},
+                             dtype=int, name='Vencidos')
+        vencidos.index.name = 'Materia'
+        return vencidos.sort_index()
+
+class VentanaPrincipal(VentanaRegistro):
+    TITULO = "Sistema de Registro - Trabajos Escolares"
+    TAMANO = "1100x700"
+    COLUMNAS_TABLA = ['Codigo', 'Materia', 'Titulo Trabajo', 'Estudiante', 'Grado', 'Profesor',
+                      'Fecha Asignacion', 'Fecha Entrega', 'Calificacion', 'Estado']
+    COLUMNA_TAGS = 'Estado'
+    TAGS = TAGS_ESTADO
+    TAG_POR_DEFECTO = 'calificado'
+    
+    def __init__(self, root, sistema=None, sqlite=False):
+        """Sin sistema se abre el libro de trabajos, o la base SQLite si sqlite es True"""
+        self.sqlite = sqlite
+        super().__init__(root, sistema)
+    
+    def crear_registro(self):
+        return RegistroTrabajosSQLite() if self.sqlite else RegistroTrabajos(en_segundo_plano=True)
+    
+    def al_recargar(self):
+        self.resumen.invalidar()
+        super().al_recargar()
+    
+    def refrescar_vista(self):
+        super().refrescar_vista()
+        self.actualizar_resumen()
     
     def crear_interfaz(self):
+        # Antes que la tabla: así el resumen recibe cada cambio antes de que la vista lo pida
+        self.resumen = self.sistema.resumen()
+        
         # Frame principal con pestañas
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill='both', expand=True, padx=10, pady=10)
@@ -167,6 +732,12 @@ class VentanaPrincipal:
         self.frame_gestionar = ttk.Frame(self.notebook)
         self.notebook.add(self.frame_gestionar, text='Gestionar Trabajos')
         self.crear_vista_gestion()
+        
+        # Pestaña 3: Resumen
+        self.frame_resumen = ttk.Frame(self.notebook)
+        self.notebook.add(self.frame_resumen, text='Resumen')
+        self.crear_vista_resumen()
+        self.notebook.bind('<<NotebookTabChanged>>', lambda e: self.actualizar_resumen())
     
     def crear_formulario_nuevo(self):
         canvas = tk.Canvas(self.frame_nuevo, bg='white', highlightthickness=0)
@@ -187,8 +758,7 @@ class VentanaPrincipal:
         # Materia
         ttk.Label(frame, text="Materia:", font=('Arial', 10, 'bold'), style='Blue.TLabel').grid(row=0, column=0, sticky='w', pady=5)
         self.combo_materia = ttk.Combobox(frame, 
-                           values=['Matemáticas', 'Español', 'Inglés', 'Ciencias', 
-                                  'Historia', 'Geografía', 'Educación Física', 'Arte', 'Informática', 'Otra'],
+                           values=MATERIAS,
                                        width=45, state='readonly',
                                        font=('Arial', 10))
         self.combo_materia.set('Matemáticas')
@@ -207,7 +777,7 @@ class VentanaPrincipal:
         # Grado
         ttk.Label(frame, text="Grado/Curso:", style='Blue.TLabel').grid(row=3, column=0, sticky='w', pady=5)
         self.combo_grado = ttk.Combobox(frame, 
-                           values=['1°', '2°', '3°', '4°', '5°', '6°', '7°', '8°', '9°', '10°', '11°', 'Otro'],
+                           values=GRADOS,
                                        width=45, state='readonly')
         self.combo_grado.set('1°')
         self.combo_grado.grid(row=3, column=1, pady=5, padx=10)
@@ -219,14 +789,14 @@ class VentanaPrincipal:
         
         # Fecha de Asignación
         ttk.Label(frame, text="Fecha de Asignación:", style='Blue.TLabel').grid(row=5, column=0, sticky='w', pady=5)
-        self.entry_fecha_asignacion = DateEntry(frame, width=45, background='darkblue',
+        self.entry_fecha_asignacion = tkcalendar.DateEntry(frame, width=45, background='darkblue',
                                      foreground='white', borderwidth=2,
                                      date_pattern='dd/mm/yyyy', locale='es_ES')
         self.entry_fecha_asignacion.grid(row=5, column=1, pady=5, padx=10)
         
         # Fecha de Entrega
         ttk.Label(frame, text="Fecha de Entrega:", style='Blue.TLabel').grid(row=6, column=0, sticky='w', pady=5)
-        self.entry_fecha_entrega = DateEntry(frame, width=45, background='darkblue',
+        self.entry_fecha_entrega = tkcalendar.DateEntry(frame, width=45, background='darkblue',
                                      foreground='white', borderwidth=2,
                                      date_pattern='dd/mm/yyyy', locale='es_ES')
         self.entry_fecha_entrega.grid(row=6, column=1, pady=5, padx=10)
@@ -234,7 +804,7 @@ class VentanaPrincipal:
         # Calificación
         ttk.Label(frame, text="Calificación Inicial:", style='Blue.TLabel').grid(row=7, column=0, sticky='w', pady=5)
         self.entry_calificacion = ttk.Combobox(frame, 
-                                               values=['N/A', 'Excelente', 'Bueno', 'Satisfactorio', 'Deficiente', 'Por Calificar'],
+                                               values=CALIFICACIONES,
                                                width=45, state='readonly')
         self.entry_calificacion.set('Por Calificar')
         self.entry_calificacion.grid(row=7, column=1, pady=5, padx=10)
@@ -242,7 +812,7 @@ class VentanaPrincipal:
         # Estado inicial
         ttk.Label(frame, text="Estado Inicial:", style='Blue.TLabel').grid(row=8, column=0, sticky='w', pady=5)
         self.combo_estado_inicial = ttk.Combobox(frame, 
-                                                 values=['No echo', 'En Progreso', 'Echo', 'Entregado', 'Revisado', 'Calificado'],
+                                                 values=ESTADOS,
                                                  width=45, state='readonly')
         self.combo_estado_inicial.set('No echo')
         self.combo_estado_inicial.grid(row=8, column=1, pady=5, padx=10)
@@ -288,32 +858,50 @@ class VentanaPrincipal:
         ttk.Button(fila1, text="📋 Mostrar Todo", 
                   command=self.actualizar_tabla).pack(side='left', padx=20)
         
+        ttk.Button(fila1, text="📤 Exportar a Excel", 
+                  command=self.exportar_excel).pack(side='left', padx=5)
+        
+        self.label_carga = ttk.Label(fila1, text='')
+        self.label_carga.pack(side='right', padx=5)
+        
         # Fila 2
         fila2 = ttk.Frame(frame_filtros)
         fila2.pack(fill='x', pady=5)
         
-        ttk.Label(fila2, text="Materia:").pack(side='left', padx=5)
-        self.combo_filtro_materia = ttk.Combobox(fila2, 
-                             values=['Todas', 'Matemáticas', 'Español', 'Inglés', 'Ciencias', 
-                                    'Historia', 'Geografía', 'Educación Física', 'Arte', 'Informática', 'Otra'],
-                                             width=12, state='readonly')
-        self.combo_filtro_materia.set('Todas')
-        self.combo_filtro_materia.pack(side='left', padx=5)
-        
-        ttk.Label(fila2, text="Estado:").pack(side='left', padx=5)
-        self.combo_filtro_estado = ttk.Combobox(fila2, 
-                                               values=['Todos', 'No echo', 'En Progreso', 'Echo', 'Entregado', 'Revisado', 'Calificado'],
-                                               width=12, state='readonly')
-        self.combo_filtro_estado.set('Todos')
-        self.combo_filtro_estado.pack(side='left', padx=5)
-        
-        ttk.Label(fila2, text="Estudiante:").pack(side='left', padx=5)
-        self.entry_filtro_estudiante = ttk.Entry(fila2, width=12)
-        self.entry_filtro_estudiante.pack(side='left', padx=5)
+        self.combo_filtro_materia = self.crear_filtro_combo(fila2, 'materia', "Materia:", MATERIAS, todos='Todas')
+        self.combo_filtro_estado = self.crear_filtro_combo(fila2, 'estado', "Estado:", ESTADOS)
+        self.entry_filtro_estudiante = self.crear_filtro_texto(fila2, 'estudiante', "Estudiante:")
         
         ttk.Button(fila2, text="🔎 Aplicar Filtros", 
                   command=self.aplicar_filtros).pack(side='left', padx=5)
         
+        # Fila 3: entregas por fecha
+        fila3 = ttk.Frame(frame_filtros)
+        fila3.pack(fill='x', pady=5)
+        
+        ttk.Button(fila3, text="⏰ Vencidos", 
+                  command=self.mostrar_vencidos).pack(side='left', padx=5)
+        
+        ttk.Label(fila3, text="Pendientes en los próximos").pack(side='left', padx=(20, 5))
+        self.spin_dias = ttk.Spinbox(fila3, from_=1, to=365, width=5)
+        self.spin_dias.set(7)
+        self.spin_dias.pack(side='left')
+        ttk.Button(fila3, text="días", 
+                  command=self.mostrar_proximas_entregas).pack(side='left', padx=5)
+        
+        ttk.Label(fila3, text="Entrega entre:").pack(side='left', padx=(20, 5))
+        self.entry_entrega_desde = tkcalendar.DateEntry(fila3, width=10, background='darkblue',
+                                             foreground='white', borderwidth=2,
+                                             date_pattern='dd/mm/yyyy', locale='es_ES')
+        self.entry_entrega_desde.pack(side='left', padx=2)
+        ttk.Label(fila3, text="y").pack(side='left', padx=2)
+        self.entry_entrega_hasta = tkcalendar.DateEntry(fila3, width=10, background='darkblue',
+                                             foreground='white', borderwidth=2,
+                                             date_pattern='dd/mm/yyyy', locale='es_ES')
+        self.entry_entrega_hasta.pack(side='left', padx=2)
+        ttk.Button(fila3, text="📅 Mostrar", 
+                  command=self.mostrar_entregas_entre).pack(side='left', padx=5)
+        
         # Tabla
         frame_tabla = ttk.Frame(self.frame_gestionar)
         frame_tabla.pack(fill='both', expand=True, padx=20, pady=10)
@@ -323,14 +911,11 @@ class VentanaPrincipal:
         scroll_x = ttk.Scrollbar(frame_tabla, orient='horizontal')
         
         # Treeview
-        self.tree = ttk.Treeview(frame_tabla, 
-                                 columns=('Codigo', 'Materia', 'Titulo', 'Estudiante', 'Grado',
-                                         'Profesor', 'F_Asignacion', 'F_Entrega', 'Calificacion', 'Estado'),
-                                 show='headings',
-                                 yscrollcommand=scroll_y.set,
-                                 xscrollcommand=scroll_x.set)
-        
-        scroll_y.config(command=self.tree.yview)
+        self.crear_tabla(ttk.Treeview(frame_tabla, 
+                                      columns=('Codigo', 'Materia', 'Titulo', 'Estudiante', 'Grado',
+                                              'Profesor', 'F_Asignacion', 'F_Entrega', 'Calificacion', 'Estado'),
+                                      show='headings',
+                                      xscrollcommand=scroll_x.set), scroll_y)
         scroll_x.config(command=self.tree.xview)
         
         # Configurar columnas
@@ -380,7 +965,7 @@ class VentanaPrincipal:
         ttk.Label(frame_botones, text="Cambiar estado a:").pack(side='left', padx=5)
         
         self.combo_nuevo_estado = ttk.Combobox(frame_botones, 
-                                              values=['No echo', 'En Progreso', 'Echo', 'Entregado', 'Revisado', 'Calificado'],
+                                              values=ESTADOS,
                                               width=15)
         self.combo_nuevo_estado.set('Entregado')
         self.combo_nuevo_estado.pack(side='left', padx=5)
@@ -391,7 +976,7 @@ class VentanaPrincipal:
         ttk.Label(frame_botones, text="Calificación:").pack(side='left', padx=5)
         
         self.combo_nueva_calificacion = ttk.Combobox(frame_botones, 
-                                                     values=['N/A', 'Excelente', 'Bueno', 'Satisfactorio', 'Deficiente', 'Por Calificar'],
+                                                     values=CALIFICACIONES,
                                                      width=15)
         self.combo_nueva_calificacion.set('Por Calificar')
         self.combo_nueva_calificacion.pack(side='left', padx=5)
@@ -404,6 +989,54 @@ class VentanaPrincipal:
         
         ttk.Button(frame_botones, text="✏️ Editar", 
                   command=self.editar_seleccionado).pack(side='left', padx=10)
+        
+        self.crear_botones_historial(frame_botones)
+    
+    def crear_vista_resumen(self):
+        self.label_vencidos = ttk.Label(self.frame_resumen, text='', font=('Arial', 11, 'bold'))
+        self.label_vencidos.pack(anchor='w', padx=20, pady=(10, 0))
+        
+        frame_materias = ttk.LabelFrame(self.frame_resumen, text="Avance por Materia", padding=10, style='Blue.TLabelframe')
+        frame_materias.pack(fill='both', expand=True, padx=20, pady=10)
+        self.columnas_materias = ['Materia'] + ESTADOS + ['Total', '% Completado', 'Vencidos']
+        self.tree_materias = ttk.Treeview(frame_materias, columns=self.columnas_materias, show='headings', height=8)
+        for columna in self.columnas_materias:
+            self.tree_materias.heading(columna, text=columna)
+            self.tree_materias.column(columna, width=110 if columna == 'Materia' else 80, anchor='center')
+        self.tree_materias.pack(fill='both', expand=True)
+        
+        frame_estudiantes = ttk.LabelFrame(self.frame_resumen, text="Promedio por Estudiante (Deficiente=1 ... Excelente=4)",
+                                           padding=10, style='Blue.TLabelframe')
+        frame_estudiantes.pack(fill='both', expand=True, padx=20, pady=10)
+        scroll_estudiantes = ttk.Scrollbar(frame_estudiantes, orient='vertical')
+        self.tree_estudiantes = ttk.Treeview(frame_estudiantes, columns=('Estudiante', 'Calificados', 'Promedio'),
+                                             show='headings', yscrollcommand=scroll_estudiantes.set)
+        scroll_estudiantes.config(command=self.tree_estudiantes.yview)
+        for columna in ('Estudiante', 'Calificados', 'Promedio'):
+            self.tree_estudiantes.heading(columna, text=columna)
+            self.tree_estudiantes.column(columna, width=200 if columna == 'Estudiante' else 100,
+                                         anchor='w' if columna == 'Estudiante' else 'center')
+        self.tree_estudiantes.pack(side='left', fill='both', expand=True)
+        scroll_estudiantes.pack(side='right', fill='y')
+    
+    def actualizar_resumen(self):
+        """Vuelve a llenar la pestaña de resumen; solo se hace si está visible"""
+        if self.notebook.select() != str(self.frame_resumen):
+            return
+        materias = self.resumen.avance_por_materia()
+        materias['% Completado'] = materias['% Completado'].map('{:.1f}%'.format)
+        self.tree_materias.delete(*self.tree_materias.get_children())
+        for fila in materias[self.columnas_materias].itertuples(index=False):
+            self.tree_materias.insert('', 'end', values=list(fila))
+        
+        estudiantes = self.resumen.promedios_por_estudiante()
+        self.tree_estudiantes.delete(*self.tree_estudiantes.get_children())
+        for estudiante, calificados, promedio in estudiantes.itertuples(index=False):
+            self.tree_estudiantes.insert('', 'end', values=(estudiante, calificados, f"{promedio:.2f}"))
+        
+        self.label_vencidos.config(
+            text=f"Trabajos vencidos sin entregar: {int(self.resumen.vencidos_por_materia().sum())}"
+        )
     
     def registrar_nuevo(self):
         materia = self.combo_materia.get()
@@ -437,83 +1070,34 @@ class VentanaPrincipal:
         self.entry_fecha_asignacion.set_date(datetime.now())
         self.entry_fecha_entrega.set_date(datetime.now())
         
-        self.actualizar_tabla()
-        
         messagebox.showinfo("Éxito", f"Trabajo registrado con código:\n{codigo}")
     
-    def buscar_registro(self):
-        codigo = self.entry_buscar.get().strip().upper()
-        if not codigo:
-            messagebox.showwarning("Advertencia", "Ingresa un código para buscar")
+    def mostrar_vencidos(self):
+        self.mostrar_resultado(self.sistema.vencidos())
+    
+    def mostrar_proximas_entregas(self):
+        try:
+            dias = int(self.spin_dias.get())
+        except ValueError:
+            messagebox.showwarning("Advertencia", "Los días deben ser un número entero")
             return
-        
-        resultado = self.sistema.buscar(codigo)
-        if resultado is None:
-            messagebox.showerror("Error", f"No se encontró el código: {codigo}")
+        self.mostrar_resultado(self.sistema.proximas_entregas(dias))
+    
+    def mostrar_entregas_entre(self):
+        self.mostrar_resultado(self.sistema.entregas_entre(self.entry_entrega_desde.get(),
+                                                           self.entry_entrega_hasta.get()))
+    
+    def al_cambiar_registro(self, cambios):
+        self.actualizar_resumen()
+        super().al_cambiar_registro(cambios)
+    
+    def exportar_excel(self):
+        try:
+            ruta = self.sistema.exportar_excel()
+        except PermissionError as e:
+            messagebox.showerror("Error de Acceso", str(e))
             return
-        
-        # Limpiar y mostrar resultado
-        self.tree.delete(*self.tree.get_children())
-        for _, row in resultado.iterrows():
-            tag = self.obtener_tag_estado(row['Estado'])
-            self.tree.insert('', 'end', values=(
-                row['Codigo'], row['Materia'], row['Titulo Trabajo'], row['Estudiante'],
-                row['Grado'], row['Profesor'], row['Fecha Asignacion'], row['Fecha Entrega'],
-                row['Calificacion'], row['Estado']
-            ), tags=(tag,))
-    
-    def obtener_tag_estado(self, estado):
-        if estado == 'No echo':
-            return 'no_echo'
-        elif estado == 'En Progreso':
-            return 'en_progreso'
-        elif estado == 'Echo':
-            return 'echo'
-        elif estado == 'Entregado':
-            return 'entregado'
-        else:
-            return 'calificado'
-    
-    def aplicar_filtros(self):
-        materia = self.combo_filtro_materia.get()
-        estado = self.combo_filtro_estado.get()
-        estudiante = self.entry_filtro_estudiante.get().strip()
-        
-        df = self.sistema.obtener_todos()
-        
-        if materia != 'Todas':
-            df = df[df['Materia'] == materia]
-        
-        if estado != 'Todos':
-            df = df[df['Estado'] == estado]
-        
-        if estudiante:
-            df = df[df['Estudiante'].str.contains(estudiante, case=False, na=False)]
-        
-        self.tree.delete(*self.tree.get_children())
-        for _, row in df.iterrows():
-            tag = self.obtener_tag_estado(row['Estado'])
-            self.tree.insert('', 'end', values=(
-                row['Codigo'], row['Materia'], row['Titulo Trabajo'], row['Estudiante'],
-                row['Grado'], row['Profesor'], row['Fecha Asignacion'], row['Fecha Entrega'],
-                row['Calificacion'], row['Estado']
-            ), tags=(tag,))
-    
-    def actualizar_tabla(self):
-        df = self.sistema.obtener_todos()
-        self.tree.delete(*self.tree.get_children())
-        for _, row in df.iterrows():
-            tag = self.obtener_tag_estado(row['Estado'])
-            self.tree.insert('', 'end', values=(
-                row['Codigo'], row['Materia'], row['Titulo Trabajo'], row['Estudiante'],
-                row['Grado'], row['Profesor'], row['Fecha Asignacion'], row['Fecha Entrega'],
-                row['Calificacion'], row['Estado']
-            ), tags=(tag,))
-        
-        # Resetear filtros
-        self.combo_filtro_materia.set('Todas')
-        self.combo_filtro_estado.set('Todos')
-        self.entry_filtro_estudiante.delete(0, 'end')
+        messagebox.showinfo("Éxito", f"Registro exportado a:\n{ruta}")
     
     def cambiar_estado_seleccionado(self):
         seleccion = self.tree.selection()
@@ -522,12 +1106,11 @@ class VentanaPrincipal:
             return
         
         item = self.tree.item(seleccion[0])
-        codigo = item['values'][0]
+        codigo = str(item['values'][0])
         nuevo_estado = self.combo_nuevo_estado.get()
         
         if self.sistema.cambiar_estado(codigo, nuevo_estado):
             messagebox.showinfo("Éxito", f"Estado actualizado a: {nuevo_estado}")
-            self.actualizar_tabla()
         else:
             messagebox.showerror("Error", "No se pudo cambiar el estado")
     
@@ -538,12 +1121,11 @@ class VentanaPrincipal:
             return
         
         item = self.tree.item(seleccion[0])
-        codigo = item['values'][0]
+        codigo = str(item['values'][0])
         nueva_calificacion = self.combo_nueva_calificacion.get()
         
         if self.sistema.actualizar_calificacion(codigo, nueva_calificacion):
             messagebox.showinfo("Éxito", f"Calificación actualizada a: {nueva_calificacion}")
-            self.actualizar_tabla()
         else:
             messagebox.showerror("Error", "No se pudo actualizar la calificación")
     
@@ -554,7 +1136,7 @@ class VentanaPrincipal:
             return
         
         item = self.tree.item(seleccion[0])
-        codigo = item['values'][0]
+        codigo = str(item['values'][0])
         titulo = item['values'][2]
         estudiante = item['values'][3]
         
@@ -567,7 +1149,6 @@ class VentanaPrincipal:
         if confirmar:
             if self.sistema.eliminar(codigo):
                 messagebox.showinfo("Éxito", "Registro eliminado correctamente")
-                self.actualizar_tabla()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el registro")
     
@@ -578,10 +1159,10 @@ class VentanaPrincipal:
             return
         
         item = self.tree.item(seleccion[0])
-        codigo = item['values'][0]
+        codigo = str(item['values'][0])
         
         # Obtener datos del dataframe
-        fila = self.sistema.df[self.sistema.df['Codigo'] == codigo].iloc[0]
+        fila = self.sistema.buscar(codigo).iloc[0]
         
         # Crear ventana de edición
         ventana_editar = tk.Toplevel(self.root)
@@ -595,8 +1176,7 @@ class VentanaPrincipal:
         # Materia
         ttk.Label(frame, text="Materia:", style='Blue.TLabel').grid(row=0, column=0, sticky='w', pady=5)
         combo_materia_edit = ttk.Combobox(frame, 
-                                          values=['Matemáticas', 'Español', 'Inglés', 'Ciencias', 
-                                                 'Historia', 'Geografía', 'Educación Física', 'Arte', 'Informática', 'Otra'],
+                                          values=MATERIAS,
                                           width=45, state='readonly')
         combo_materia_edit.set(fila['Materia'])
         combo_materia_edit.grid(row=0, column=1, pady=5, padx=10)
@@ -622,7 +1202,7 @@ class VentanaPrincipal:
         # Estado
         ttk.Label(frame, text="Estado:", style='Blue.TLabel').grid(row=4, column=0, sticky='w', pady=5)
         combo_estado_edit = ttk.Combobox(frame, 
-                                         values=['No echo', 'En Progreso', 'Echo', 'Entregado', 'Revisado', 'Calificado'],
+                                         values=ESTADOS,
                                          width=45, state='readonly')
         combo_estado_edit.set(fila['Estado'])
         combo_estado_edit.grid(row=4, column=1, pady=5, padx=10)
@@ -630,7 +1210,7 @@ class VentanaPrincipal:
         # Calificación
         ttk.Label(frame, text="Calificación:", style='Blue.TLabel').grid(row=5, column=0, sticky='w', pady=5)
         combo_calificacion_edit = ttk.Combobox(frame, 
-                                               values=['N/A', 'Excelente', 'Bueno', 'Satisfactorio', 'Deficiente', 'Por Calificar'],
+                                               values=CALIFICACIONES,
                                                width=45, state='readonly')
         combo_calificacion_edit.set(fila['Calificacion'])
         combo_calificacion_edit.grid(row=5, column=1, pady=5, padx=10)
@@ -663,20 +1243,19 @@ class VentanaPrincipal:
                 return
             
             # Actualizar el registro
-            indice = self.sistema.df[self.sistema.df['Codigo'] == codigo].index[0]
-            self.sistema.df.loc[indice, 'Materia'] = nueva_materia
-            self.sistema.df.loc[indice, 'Titulo Trabajo'] = nuevo_titulo
-            self.sistema.df.loc[indice, 'Estudiante'] = nuevo_estudiante
-            self.sistema.df.loc[indice, 'Profesor'] = nuevo_profesor
-            self.sistema.df.loc[indice, 'Estado'] = nuevo_estado
-            self.sistema.df.loc[indice, 'Calificacion'] = nueva_calificacion
-            self.sistema.df.loc[indice, 'Descripcion'] = nueva_descripcion
-            self.sistema.df.loc[indice, 'Observaciones'] = nuevas_observaciones
-            self.sistema.guardar()
+            self.sistema.editar(codigo, {
+                'Materia': nueva_materia,
+                'Titulo Trabajo': nuevo_titulo,
+                'Estudiante': nuevo_estudiante,
+                'Profesor': nuevo_profesor,
+                'Estado': nuevo_estado,
+                'Calificacion': nueva_calificacion,
+                'Descripcion': nueva_descripcion,
+                'Observaciones': nuevas_observaciones
+            })
             
             messagebox.showinfo("Éxito", "Trabajo actualizado correctamente")
             ventana_editar.destroy()
-            self.actualizar_tabla()
         
         # Botones
         frame_botones = ttk.Frame(frame)
@@ -688,12 +1267,5 @@ class VentanaPrincipal:
               command=ventana_editar.destroy, style='Blue.TButton').pack(side='left', padx=5)
 
 if __name__ == "__main__":
-    try:
-        root = tk.Tk()
-        app = VentanaPrincipal(root)
-        root.mainloop()
-    except PermissionError as e:
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror("Error de Acceso", str(e))
-        root.destroy()
\ No newline at end of file
+    # python administrador-trabajos.py --sqlite  usa la base SQLite en lugar del libro
+    iniciar(VentanaPrincipal, sqlite='--sqlite' in sys.argv)
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""Tiempo de importación de cada aplicación, desglosado con python -X importtime.
+
+Carga el script en un proceso nuevo (sin abrir la ventana) y muestra el total y
+los módulos de primer nivel que más tardan, con lo que importan debajo.
+
+Uso: python benchmarks/arranque.py [script.py ...] [--top N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from comun import CARPETA
+
+SCRIPTS = ['administrador-trabajos.py', 'e-in.py', 'e-admin-doc.py']
+
+CARGAR = """
+import importlib.util, sys
+sys.path.insert(0, {carpeta!r})
+spec = importlib.util.spec_from_file_location('app', {ruta!r})
+modulo = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(modulo)
+"""
+
+
+def perfil(script):
+    """Lista de (módulo, microsegundos acumulados) de los imports de primer nivel"""
+    codigo = CARGAR.format(carpeta=CARPETA, ruta=os.path.join(CARPETA, script))
+    salida = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo],
+                            capture_output=True, text=True, check=True).stderr
+    modulos = []
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, nombre = linea.split('|')
+        # Sin sangría: lo importó el script, no otro módulo
+        if not nombre.startswith('  '):
+            modulos.append((nombre.strip(), int(acumulado)))
+    return modulos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('scripts', nargs='*', default=SCRIPTS)
+    parser.add_argument('--top', type=int, default=8)
+    argumentos = parser.parse_args()
+    for script in argumentos.scripts:
+        modulos = perfil(script)
+        total = sum(acumulado for _, acumulado in modulos)
+        print(f"\n{script}: {total / 1000:,.1f} ms en imports")
+        for nombre, acumulado in sorted(modulos, key=lambda m: -m[1])[:argumentos.top]:
+            print(f"  {nombre:<30} {acumulado / 1000:>9.1f} ms")
@@ -0,0 +1,12 @@
+"""Lo que comparten los benchmarks: la carpeta de los scripts y cómo cargarlos."""
+import os
+import sys
+
+CARPETA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Los scripts importan registro_base y tabla_virtual de su propia carpeta
+if CARPETA not in sys.path:
+    sys.path.insert(0, CARPETA)
+
+from registro_base import cargar_modulo
+
+__all__ = ['CARPETA', 'cargar_modulo']
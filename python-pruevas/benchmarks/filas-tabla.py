@@ -0,0 +1,82 @@
+"""Filas por segundo al convertir el registro para el Treeview: iterrows + if/elif contra columnas en bloque.
+
+Uso: python benchmarks/filas-tabla.py [filas]
+"""
+import random
+import sys
+import timeit
+
+import pandas as pd
+
+from comun import cargar_modulo
+from registro_base import formatear_fecha
+
+trabajos = cargar_modulo('administrador-trabajos.py')
+
+
+def registro_sintetico(filas):
+    fechas = [f"{d:02d}/{m:02d}/2026" for m in range(1, 13) for d in range(1, 29)]
+    df = pd.DataFrame({
+        'Codigo': [f"{i:08X}" for i in range(filas)],
+        'Materia': random.choices(trabajos.MATERIAS, k=filas),
+        'Titulo Trabajo': [f"Trabajo {i}" for i in range(filas)],
+        'Estudiante': [f"Estudiante {i % 5000}" for i in range(filas)],
+        'Grado': random.choices(trabajos.GRADOS, k=filas),
+        'Profesor': [f"Profesor {i % 40}" for i in range(filas)],
+        'Fecha Asignacion': random.choices(fechas, k=filas),
+        'Fecha Entrega': random.choices(fechas, k=filas),
+        'Calificacion': random.choices(trabajos.CALIFICACIONES, k=filas),
+        'Estado': random.choices(trabajos.ESTADOS, k=filas),
+        'Descripcion': [''] * filas,
+        'Observaciones': [''] * filas
+    })
+    registro = trabajos.RegistroTrabajos.__new__(trabajos.RegistroTrabajos)
+    return registro.aplicar_tipos(df)
+
+
+def obtener_tag_estado(estado):
+    if estado == 'No echo':
+        return 'no_echo'
+    elif estado == 'En Progreso':
+        return 'en_progreso'
+    elif estado == 'Echo':
+        return 'echo'
+    elif estado == 'Entregado':
+        return 'entregado'
+    else:
+        return 'calificado'
+
+
+def convertir_antes(df):
+    """La conversión anterior: una Series por fila y la cadena de if/elif"""
+    resultado = []
+    for _, row in df.iterrows():
+        valores = (
+            row['Codigo'], row['Materia'], row['Titulo Trabajo'], row['Estudiante'],
+            row['Grado'], row['Profesor'], formatear_fecha(row['Fecha Asignacion']),
+            formatear_fecha(row['Fecha Entrega']), row['Calificacion'], row['Estado']
+        )
+        resultado.append((valores, obtener_tag_estado(row['Estado'])))
+    return resultado
+
+
+def convertir_despues(df):
+    # convertir_filas no usa nada de la ventana fuera de los atributos de clase
+    ventana = trabajos.VentanaPrincipal.__new__(trabajos.VentanaPrincipal)
+    return list(ventana.convertir_filas(df))
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = registro_sintetico(filas)
+    assert convertir_antes(df.iloc[:1000]) == convertir_despues(df.iloc[:1000])
+
+    # Una ventana de la tabla virtual (~65 filas) y el registro completo
+    print(f"{'Bloque':>10} {'Antes (filas/s)':>18} {'Después (filas/s)':>20} {'Mejora':>8}")
+    print("-" * 60)
+    for tamano in (65, filas):
+        bloque = df.iloc[:tamano]
+        repeticiones = max(1, 20_000 // tamano)
+        antes = timeit.timeit(lambda: convertir_antes(bloque), number=repeticiones) / repeticiones
+        despues = timeit.timeit(lambda: convertir_despues(bloque), number=repeticiones) / repeticiones
+        print(f"{tamano:>10,} {tamano / antes:>18,.0f} {tamano / despues:>20,.0f} {antes / despues:>7.1f}x")
@@ -0,0 +1,53 @@
+"""Compara la búsqueda por Codigo con máscara booleana contra el índice Codigo -> fila.
+
+Uso: python benchmarks/indice-codigos.py
+"""
+import random
+import timeit
+
+import pandas as pd
+
+from comun import cargar_modulo
+from registro_base import AlmacenExcel
+
+trabajos = cargar_modulo('administrador-trabajos.py')
+
+
+class AlmacenSintetico(AlmacenExcel):
+    """Entrega un registro generado en memoria y no escribe nada a disco"""
+    def __init__(self, filas):
+        super().__init__('benchmark.xlsx')
+        self.filas = filas
+
+    def cargar_por_bloques(self, tamano_bloque):
+        columnas = trabajos.RegistroTrabajos.COLUMNAS
+        codigos = [f"{i:08X}" for i in range(self.filas)]
+        datos = {columna: ['x'] * self.filas for columna in columnas}
+        datos['Codigo'] = codigos
+        yield pd.DataFrame(datos, columns=columnas)
+
+    def terminar_carga(self, df):
+        pass
+
+    def pendientes(self):
+        return []
+
+    def registrar_lote(self, registro, cambios):
+        pass
+
+
+def medir(filas, repeticiones=200):
+    registro = trabajos.RegistroTrabajos(almacen=AlmacenSintetico(filas))
+    df = registro.df
+    codigos = random.choices(list(registro.indice), k=repeticiones)
+
+    mascara = timeit.timeit(lambda: [df[df['Codigo'] == c] for c in codigos], number=1)
+    indice = timeit.timeit(lambda: [registro.buscar(c) for c in codigos], number=1)
+    return mascara / repeticiones, indice / repeticiones
+
+
+if __name__ == "__main__":
+    print(f"{'Filas':>10} {'Máscara (ms)':>14} {'Índice (ms)':>14} {'Mejora':>8}")
+    for filas in (1_000, 100_000, 1_000_000):
+        mascara, indice = medir(filas)
+        print(f"{filas:>10,} {mascara * 1000:>14.3f} {indice * 1000:>14.3f} {mascara / indice:>7.0f}x")
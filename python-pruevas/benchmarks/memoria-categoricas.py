@@ -0,0 +1,58 @@
+"""Memoria de un registro de trabajos sintético de 500k filas: columnas object vs categóricas.
+
+Uso: python benchmarks/memoria-categoricas.py [filas]
+"""
+import random
+import sys
+import timeit
+
+import pandas as pd
+
+from comun import cargar_modulo
+
+trabajos = cargar_modulo('administrador-trabajos.py')
+
+
+def registro_sintetico(filas):
+    """DataFrame como el que devuelve read_excel: todo texto, fechas dd/mm/aaaa"""
+    profesores = [f"Profesor {i}" for i in range(40)]
+    fechas = [f"{d:02d}/{m:02d}/2026" for m in range(1, 13) for d in range(1, 29)]
+    return pd.DataFrame({
+        'Codigo': [f"{i:08X}" for i in range(filas)],
+        'Materia': random.choices(trabajos.MATERIAS, k=filas),
+        'Titulo Trabajo': [f"Trabajo {i}" for i in range(filas)],
+        'Estudiante': [f"Estudiante {i % 5000}" for i in range(filas)],
+        'Grado': random.choices(trabajos.GRADOS, k=filas),
+        'Profesor': random.choices(profesores, k=filas),
+        'Fecha Asignacion': random.choices(fechas, k=filas),
+        'Fecha Entrega': random.choices(fechas, k=filas),
+        'Calificacion': random.choices(trabajos.CALIFICACIONES, k=filas),
+        'Estado': random.choices(trabajos.ESTADOS, k=filas),
+        'Descripcion': [''] * filas,
+        'Observaciones': [''] * filas
+    }).astype(object)
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    antes = registro_sintetico(filas)
+    # aplicar_tipos solo usa los atributos de clase, no hace falta abrir un archivo
+    registro = trabajos.RegistroTrabajos.__new__(trabajos.RegistroTrabajos)
+    despues = registro.aplicar_tipos(antes.copy())
+
+    memoria_antes = antes.memory_usage(deep=True)
+    memoria_despues = despues.memory_usage(deep=True)
+    print(f"Registro sintético de {filas:,} filas\n")
+    print(f"{'Columna':<18} {'Antes (MB)':>12} {'Después (MB)':>14}")
+    print("-" * 46)
+    for columna in antes.columns:
+        print(f"{columna:<18} {memoria_antes[columna] / 1e6:>12.1f} {memoria_despues[columna] / 1e6:>14.1f}")
+    print("-" * 46)
+    print(f"{'TOTAL':<18} {memoria_antes.sum() / 1e6:>12.1f} {memoria_despues.sum() / 1e6:>14.1f}")
+
+    print(f"\n{'Filtro':<18} {'Antes (ms)':>12} {'Después (ms)':>14}")
+    print("-" * 46)
+    for columna, valor in (('Estado', 'Entregado'), ('Materia', 'Arte')):
+        t_antes = timeit.timeit(lambda: antes[antes[columna] == valor], number=10) / 10
+        t_despues = timeit.timeit(lambda: despues[despues[columna] == valor], number=10) / 10
+        print(f"{columna + ' ==':<18} {t_antes * 1000:>12.1f} {t_despues * 1000:>14.1f}")
@@ -0,0 +1,296 @@
+"""Tiempos de RegistroTrabajos, RegistroArticulos y ControlFinanciero con datos sintéticos.
+
+Para cada clase y tamaño mide: cargar (libro sin caché), cargar_cache, insertar
+uno, insertar en lote, buscar por código, filtrar, editar y guardar. Todo corre
+en una carpeta temporal y sin abrir ventanas, así sirve en una máquina sin pantalla.
+
+Los resultados se guardan en JSON con el commit actual para comparar dos versiones:
+  python benchmarks/registros.py --filas 10000 100000 --salida antes.json
+  python benchmarks/registros.py --filas 10000 100000 --comparar antes.json
+
+Uso: python benchmarks/registros.py [--filas N ...] [--clases ...] [--salida archivo.json] [--comparar base.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from comun import CARPETA, cargar_modulo
+from registro_base import AlmacenDiario
+
+trabajos = cargar_modulo('administrador-trabajos.py')
+articulos = cargar_modulo('e-in.py')
+finanzas = cargar_modulo('ad-ahorros.py')
+
+FECHAS = [f"{d:02d}/{m:02d}/2026" for m in range(1, 13) for d in range(1, 29)]
+# Consultas de lectura por medición; las escrituras usan --repeticiones
+CONSULTAS = 200
+
+
+def trabajos_sinteticos(filas, inicio=0):
+    """Filas de trabajos como dicts de texto, como las recibe agregar_registros"""
+    return [{
+        'Codigo': f"{i:08X}",
+        'Materia': random.choice(trabajos.MATERIAS),
+        'Titulo Trabajo': f"Trabajo {i}",
+        'Estudiante': f"Estudiante {i % 5000}",
+        'Grado': random.choice(trabajos.GRADOS),
+        'Profesor': f"Profesor {i % 40}",
+        'Fecha Asignacion': random.choice(FECHAS),
+        'Fecha Entrega': random.choice(FECHAS),
+        'Calificacion': random.choice(trabajos.CALIFICACIONES),
+        'Estado': random.choice(trabajos.ESTADOS),
+        'Descripcion': '',
+        'Observaciones': ''
+    } for i in range(inicio, inicio + filas)]
+
+
+def articulos_sinteticos(filas, inicio=0):
+    return [{
+        'Codigo': f"{i:08X}",
+        'Tipo': random.choice(articulos.TIPOS),
+        'Articulo': f"Artículo {i % 2000}",
+        'Persona': f"Persona {i % 3000}",
+        'Fecha': random.choice(FECHAS),
+        'Estado': random.choice(articulos.ESTADOS),
+        'Notas': ''
+    } for i in range(inicio, inicio + filas)]
+
+
+def transacciones_sinteticas(cantidad, inicio=0):
+    """Transacciones con el mismo formato que guarda ControlFinanciero"""
+    base = datetime(2026, 1, 1)
+    transacciones = []
+    for i in range(inicio, inicio + cantidad):
+        tipo = 'ingreso' if random.random() < 0.3 else 'gasto'
+        transacciones.append({
+            'id': i + 1,
+            'tipo': tipo,
+            'descripcion': f"Movimiento {i}",
+            'monto': round(random.uniform(1, 2000), 2),
+            'categoria': random.choice(finanzas.CATEGORIAS[tipo]),
+            'fecha': (base + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S')
+        })
+    return transacciones
+
+
+def escribir_libro(ruta, filas, columnas_fecha):
+    """Escribe el libro como lo deja la aplicación: fechas de Excel dd/mm/aaaa"""
+    df = pd.DataFrame(filas)
+    for columna in columnas_fecha:
+        df[columna] = pd.to_datetime(df[columna], format='%d/%m/%Y')
+    with pd.ExcelWriter(ruta, date_format='DD/MM/YYYY', datetime_format='DD/MM/YYYY') as writer:
+        df.to_excel(writer, index=False)
+
+
+def borrar_cache(ruta):
+    for sufijo in ('.cache.feather', '.cache.json'):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+
+
+def medir(funcion, argumentos):
+    """Segundos de cada llamada a funcion(*args) para cada args de la lista"""
+    tiempos = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        funcion(*args)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def medir_registro(clase, abrir, filas_nuevas, filtrar, editar, filas, repeticiones, lote):
+    """Mide un registro basado en un libro; abrir(ruta) lo construye sin ventanas"""
+    resultados = {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'registro.xlsx')
+        escribir_libro(ruta, filas_nuevas(filas), clase.COLUMNAS_FECHA)
+
+        borrar_cache(ruta)
+        inicio = time.perf_counter()
+        registro = abrir(ruta)
+        resultados['cargar'] = [time.perf_counter() - inicio]
+        registro.cerrar()
+        inicio = time.perf_counter()
+        registro = abrir(ruta)
+        resultados['cargar_cache'] = [time.perf_counter() - inicio]
+
+        try:
+            nuevas = filas_nuevas(repeticiones, inicio=filas)
+            columnas = [columna for columna in clase.COLUMNAS if columna != 'Codigo']
+            resultados['insertar'] = medir(
+                registro.agregar_registro,
+                [[fila[columna] for columna in columnas] for fila in nuevas]
+            )
+            resultados['insertar_lote'] = medir(
+                registro.agregar_registros, [[filas_nuevas(lote, inicio=filas + repeticiones)]]
+            )
+            codigos = random.choices(list(registro.indice), k=CONSULTAS)
+            resultados['buscar'] = medir(registro.buscar, [[codigo] for codigo in codigos])
+            resultados['filtrar'] = medir(filtrar(registro), [[] for _ in range(CONSULTAS)])
+            editados = random.sample(list(registro.indice), repeticiones)
+            resultados['editar'] = medir(editar(registro), [[codigo] for codigo in editados])
+            resultados['guardar'] = medir(registro.guardar, [[]])
+        finally:
+            registro.cerrar()
+    return resultados
+
+
+def medir_trabajos(filas, repeticiones, lote):
+    def abrir(ruta):
+        # Sin compactación automática, así las inserciones no compiten con una escritura de fondo
+        almacen = AlmacenDiario(ruta, limite_compactacion=float('inf'))
+        return trabajos.RegistroTrabajos(ruta, almacen=almacen)
+
+    def filtrar(registro):
+        return lambda: registro.filtrar(materia=random.choice(trabajos.MATERIAS),
+                                        estado=random.choice(trabajos.ESTADOS))
+
+    def editar(registro):
+        return lambda codigo: registro.cambiar_estado(codigo, random.choice(trabajos.ESTADOS))
+
+    return medir_registro(trabajos.RegistroTrabajos, abrir, trabajos_sinteticos,
+                          filtrar, editar, filas, repeticiones, lote)
+
+
+def medir_articulos(filas, repeticiones, lote):
+    def filtrar(registro):
+        return lambda: registro.filtrar_por_estado(random.choice(articulos.ESTADOS))
+
+    def editar(registro):
+        return lambda codigo: registro.cambiar_estado(codigo, random.choice(articulos.ESTADOS))
+
+    # Sin escritor en segundo plano: cada cambio incluye la reescritura del libro
+    return medir_registro(articulos.RegistroArticulos, articulos.RegistroArticulos,
+                          articulos_sinteticos, filtrar, editar, filas, repeticiones, lote)
+
+
+def medir_finanzas(filas, repeticiones, lote):
+    resultados = {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, 'finanzas.json')
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump({'transacciones': transacciones_sinteticas(filas), 'meta_ahorro': 10000},
+                      f, indent=2, ensure_ascii=False)
+
+        inicio = time.perf_counter()
+        control = finanzas.ControlFinanciero(ruta)
+        resultados['cargar'] = [time.perf_counter() - inicio]
+
+        nuevas = transacciones_sinteticas(repeticiones, inicio=filas)
+        resultados['insertar'] = medir(control.registrar_transaccion, [
+            [t['tipo'], t['descripcion'], t['monto'], t['categoria']] for t in nuevas
+        ])
+        resultados['insertar_lote'] = medir(control.registrar_transacciones, [
+            [transacciones_sinteticas(lote, inicio=filas + repeticiones)]
+        ])
+        ids = [t['id'] for t in random.choices(list(control.transacciones.values()), k=CONSULTAS)]
+        resultados['buscar'] = medir(control.buscar_transaccion, [[i] for i in ids])
+        categorias = finanzas.CATEGORIAS['gasto']
+        resultados['filtrar'] = medir(control.filtrar_por_categoria, [
+            [random.choice(categorias)] for _ in range(CONSULTAS)
+        ])
+        resultados['totales'] = medir(control.calcular_totales, [[] for _ in range(CONSULTAS)])
+        editados = [t['id'] for t in random.sample(list(control.transacciones.values()), repeticiones)]
+        resultados['editar'] = medir(control.editar_transaccion, [
+            [i, {'monto': round(random.uniform(1, 2000), 2)}] for i in editados
+        ])
+        resultados['guardar'] = medir(control.guardar_datos, [[]])
+    return resultados
+
+
+CLASES = {
+    'RegistroTrabajos': medir_trabajos,
+    'RegistroArticulos': medir_articulos,
+    'ControlFinanciero': medir_finanzas,
+}
+
+
+def commit_actual():
+    try:
+        salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=CARPETA,
+                                capture_output=True, text=True, check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Tiempos de los registros con datos sintéticos.")
+    parser.add_argument('--filas', type=int, nargs='+', default=[10_000, 100_000],
+                        help="tamaños a medir, p.ej. 10000 100000 1000000")
+    parser.add_argument('--clases', nargs='+', choices=list(CLASES), default=list(CLASES))
+    parser.add_argument('--repeticiones', type=int, default=5,
+                        help="inserciones y ediciones sueltas por medición")
+    parser.add_argument('--lote', type=int, default=1000, help="filas de la inserción en lote")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', help="archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para mostrar la diferencia")
+    return parser
+
+
+def mostrar(mediciones, base=None):
+    anteriores = {}
+    if base is not None:
+        anteriores = {(m['clase'], m['filas'], m['operacion']): m['mediana'] for m in base['mediciones']}
+        print(f"Comparado con {base.get('commit') or base['archivo']}")
+    print(f"{'Clase':<18} {'Filas':>10} {'Operación':<14} {'Mediana (ms)':>13} {'Mínimo (ms)':>12} {'Cambio':>8}")
+    for m in mediciones:
+        anterior = anteriores.get((m['clase'], m['filas'], m['operacion']))
+        cambio = f"{m['mediana'] / anterior:>7.2f}x" if anterior else ''
+        print(f"{m['clase']:<18} {m['filas']:>10,} {m['operacion']:<14} "
+              f"{m['mediana'] * 1000:>13.3f} {m['minimo'] * 1000:>12.3f} {cambio:>8}")
+
+
+def main(argv=None):
+    argumentos = crear_parser().parse_args(argv)
+    random.seed(argumentos.semilla)
+    mediciones = []
+    for clase in argumentos.clases:
+        for filas in argumentos.filas:
+            print(f"{clase} con {filas:,} filas...", file=sys.stderr)
+            resultados = CLASES[clase](filas, argumentos.repeticiones, argumentos.lote)
+            for operacion, tiempos in resultados.items():
+                mediciones.append({
+                    'clase': clase,
+                    'filas': filas,
+                    'operacion': operacion,
+                    'llamadas': len(tiempos),
+                    'mediana': statistics.median(tiempos),
+                    'minimo': min(tiempos),
+                    'total': sum(tiempos)
+                })
+
+    corrida = {
+        'commit': commit_actual(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'parametros': {'repeticiones': argumentos.repeticiones, 'lote': argumentos.lote,
+                       'semilla': argumentos.semilla},
+        'mediciones': mediciones
+    }
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as f:
+            json.dump(corrida, f, indent=2, ensure_ascii=False)
+
+    base = None
+    if argumentos.comparar:
+        with open(argumentos.comparar, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        base['archivo'] = argumentos.comparar
+    mostrar(mediciones, base)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
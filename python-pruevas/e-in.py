@@ -1,43 +1,45 @@
-
-import pandas as pd
-import random
-import string
 from datetime import datetime
-import os
 import tkinter as tk
 from tkinter import ttk, messagebox
-from tkcalendar import DateEntry
 
-class RegistroArticulos:
-    def __init__(self, archivo='registro.xlsx'):
-        self.archivo = archivo
-        self.codigos_usados = set()
-        self.cargar_datos()
+from registro_base import (
+    validar_fecha, TrabajadorSegundoPlano, AlmacenExcel, RegistroBase, importar_diferido
+)
+from ventana_registro import VentanaRegistro, iniciar as iniciar_ventana
+
+# Se importa al construir la interfaz
+tkcalendar = importar_diferido('tkcalendar')
+
+# Valores conocidos de los combos; también son las categorías de las columnas
+TIPOS = ['Préstamo', 'Encargo', 'Proyecto', 'Otro']
+ESTADOS = ['Prestado', 'Devuelto', 'No devuelto',
+           'Pendiente', 'En proceso', 'Completado', 'Cancelado']
+ESTADOS_EDICION = ESTADOS + ['No echo', 'Echo']
+# Colores de la tabla por tipo; los que no están usan 'otro'
+TAGS_TIPO = {'Préstamo': 'prestamo', 'Encargo': 'encargo', 'Proyecto': 'proyecto'}
+
+class RegistroArticulos(RegistroBase):
+    """Registro de préstamos y encargos guardado en un libro de Excel.
     
-    def cargar_datos(self):
-        if os.path.exists(self.archivo):
-            try:
-                self.df = pd.read_excel(self.archivo)
-                self.codigos_usados = set(self.df['Codigo'].tolist())
-            except PermissionError:
-                raise PermissionError(
-                    f"El archivo '{self.archivo}' está abierto en otro programa.\n"
-                    "Por favor ciérralo y vuelve a intentar."
-                )
-        else:
-            self.df = pd.DataFrame(columns=[
-                'Codigo', 'Tipo', 'Articulo', 'Persona', 'Fecha', 
-                'Estado', 'Notas'
-            ])
+    Cada cambio reescribe el libro completo (AlmacenExcel), en segundo plano si
+    se pasa un escritor. Varios procesos pueden compartir el libro: si otro
+    guardó desde la última vez se recarga su libro y se vuelven a aplicar encima
+    los cambios propios; si los dos cambiaron la misma celda gana el último en guardar.
+    """
+    ARCHIVO = 'registro.xlsx'
+    COLUMNAS = ['Codigo', 'Tipo', 'Articulo', 'Persona', 'Fecha', 'Estado', 'Notas']
+    COLUMNAS_CATEGORICAS = {'Tipo': TIPOS, 'Estado': ESTADOS_EDICION}
+    COLUMNAS_FECHA = ['Fecha']
+    COLUMNAS_TEXTO = ['Persona', 'Articulo']
+    COLUMNAS_FILTRO = {'tipo': 'Tipo', 'estado': 'Estado', 'persona': 'Persona'}
     
-    def generar_codigo(self):
-        while True:
-            codigo = ''.join(random.choices(
-                string.ascii_uppercase + string.digits, k=8
-            ))
-            if codigo not in self.codigos_usados:
-                self.codigos_usados.add(codigo)
-                return codigo
+    def __init__(self, archivo=None, escritor=None, en_segundo_plano=False):
+        """escritor (un TrabajadorSegundoPlano) hace que cada guardado del libro vaya en su hilo"""
+        self.escritor = escritor
+        super().__init__(archivo, en_segundo_plano=en_segundo_plano)
+    
+    def crear_almacen(self):
+        return AlmacenExcel(self.archivo, self.escritor)
     
     def agregar_registro(self, tipo, articulo, persona, fecha, estado, notas=''):
         codigo = self.generar_codigo()
@@ -52,80 +54,32 @@ class RegistroArticulos:
             'Notas': notas
         }
         
-        self.df = pd.concat([self.df, pd.DataFrame([nuevo_registro])], 
-                           ignore_index=True)
-        self.guardar()
+        self.registrar_cambio('agregar', codigo, nuevo_registro)
         return codigo
     
     def cambiar_estado(self, codigo, nuevo_estado):
-        indice = self.df[self.df['Codigo'] == codigo].index
-        if len(indice) == 0:
-            return False
-        
-        self.df.loc[indice, 'Estado'] = nuevo_estado
-        self.guardar()
-        return True
-    
-    def eliminar(self, codigo):
-        indice = self.df[self.df['Codigo'] == codigo].index
-        if len(indice) == 0:
-            return False
-        
-        self.df = self.df.drop(indice)
-        self.codigos_usados.discard(codigo)
-        self.guardar()
-        return True
-    
-    def buscar(self, codigo):
-        resultado = self.df[self.df['Codigo'] == codigo]
-        if len(resultado) == 0:
-            return None
-        return resultado
-    
-    def obtener_todos(self):
-        return self.df
+        return self.editar(codigo, {'Estado': nuevo_estado})
     
     def filtrar_por_estado(self, estado):
         return self.df[self.df['Estado'] == estado]
     
     def filtrar_por_tipo(self, tipo):
         return self.df[self.df['Tipo'] == tipo]
-    
-    def guardar(self):
-        try:
-            self.df.to_excel(self.archivo, index=False)
-        except PermissionError:
-            raise PermissionError(
-                f"No se puede guardar '{self.archivo}'.\n"
-                "El archivo está abierto en otro programa. Ciérralo e intenta de nuevo."
-            )
 
-class VentanaPrincipal:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Sistema de Registro - Préstamos y Encargos")
-        self.root.geometry("1000x650")
-        # Estilos personalizados (paleta azul oscura, profesional)
-        self.style = ttk.Style()
-        try:
-            self.style.theme_use('clam')
-        except Exception:
-            pass
-        # LabelFrame oscuro
-        self.style.configure('Blue.TLabelframe', background='#0b3d91')
-        self.style.configure('Blue.TLabelframe.Label', background='#0b3d91', foreground='#ffffff', font=('Arial', 11, 'bold'))
-        # Labels dentro de los frames
-        self.style.configure('Blue.TLabel', background='#0b3d91', foreground='#ffffff', font=('Arial', 10))
-        # Botones con azul más oscuro
-        self.style.configure('Blue.TButton', background='#0b57d0', foreground='#ffffff', font=('Arial', 10, 'bold'))
-        self.style.map('Blue.TButton', background=[('active', '#0844a8')], foreground=[('active', '#ffffff')])
-        # Treeview encabezados
-        self.style.configure('Treeview.Heading', background='#0b57d0', foreground='#ffffff', font=('Arial', 10, 'bold'))
-        self.style.configure('Treeview', background='#ffffff', foreground='#000000', fieldbackground='#ffffff')
-        self.sistema = RegistroArticulos()
-        
-        self.crear_interfaz()
-        self.actualizar_tabla()
+class VentanaPrincipal(VentanaRegistro):
+    TITULO = "Sistema de Registro - Préstamos y Encargos"
+    TAMANO = "1000x650"
+    COLUMNAS_TABLA = ['Codigo', 'Tipo', 'Articulo', 'Persona', 'Fecha', 'Estado', 'Notas']
+    COLUMNA_TAGS = 'Tipo'
+    TAGS = TAGS_TIPO
+    TAG_POR_DEFECTO = 'otro'
+    
+    def __init__(self, root, archivo=None):
+        self.archivo = archivo
+        super().__init__(root)
+    
+    def crear_registro(self):
+        return RegistroArticulos(self.archivo, escritor=TrabajadorSegundoPlano(), en_segundo_plano=True)
     
     def crear_interfaz(self):
         # Frame principal con pestañas
@@ -149,7 +103,7 @@ class VentanaPrincipal:
         # Tipo
         ttk.Label(frame, text="Tipo:", font=('Arial', 10, 'bold'), style='Blue.TLabel').grid(row=0, column=0, sticky='w', pady=5)
         self.combo_tipo = ttk.Combobox(frame, 
-                           values=['Préstamo', 'Encargo', 'Proyecto', 'Otro'],
+                           values=TIPOS,
                                        width=37, state='readonly',
                                        font=('Arial', 10))
         self.combo_tipo.set('Préstamo')
@@ -170,7 +124,7 @@ class VentanaPrincipal:
         
         # Fecha
         ttk.Label(frame, text="Fecha:", style='Blue.TLabel').grid(row=3, column=0, sticky='w', pady=5)
-        self.entry_fecha = DateEntry(frame, width=37, background='darkblue',
+        self.entry_fecha = tkcalendar.DateEntry(frame, width=37, background='darkblue',
                                      foreground='white', borderwidth=2,
                                      date_pattern='dd/mm/yyyy', locale='es_ES')
         self.entry_fecha.grid(row=3, column=1, pady=5, padx=10)
@@ -178,8 +132,7 @@ class VentanaPrincipal:
         # Estado inicial
         ttk.Label(frame, text="Estado inicial:", style='Blue.TLabel').grid(row=4, column=0, sticky='w', pady=5)
         self.combo_estado_inicial = ttk.Combobox(frame, 
-                                                 values=['Prestado', 'Devuelto', 'No devuelto',
-                                                        'Pendiente', 'En proceso', 'Completado', 'Cancelado'],
+                                                 values=ESTADOS,
                                                  width=37, state='readonly')
         self.combo_estado_inicial.set('Prestado')
         self.combo_estado_inicial.grid(row=4, column=1, pady=5, padx=10)
@@ -250,25 +203,16 @@ class VentanaPrincipal:
         ttk.Button(fila1, text="Mostrar Todo", 
                   command=self.actualizar_tabla).pack(side='left', padx=20)
         
+        self.label_carga = ttk.Label(fila1, text='')
+        self.label_carga.pack(side='right', padx=5)
+        
         # Fila 2
         fila2 = ttk.Frame(frame_filtros)
         fila2.pack(fill='x', pady=5)
         
-        ttk.Label(fila2, text="Tipo:").pack(side='left', padx=5)
-        self.combo_filtro_tipo = ttk.Combobox(fila2, 
-                             values=['Todos', 'Préstamo', 'Encargo', 'Proyecto', 'Otro'],
-                                             width=12, state='readonly')
-        self.combo_filtro_tipo.set('Todos')
-        self.combo_filtro_tipo.pack(side='left', padx=5)
-        
-        ttk.Label(fila2, text="Estado:").pack(side='left', padx=5)
-        self.combo_filtro_estado = ttk.Combobox(fila2, 
-                                               values=['Todos', 'Prestado', 'Devuelto', 
-                                                      'No devuelto', 'Pendiente', 
-                                                      'En proceso', 'Completado', 'Cancelado'],
-                                               width=12, state='readonly')
-        self.combo_filtro_estado.set('Todos')
-        self.combo_filtro_estado.pack(side='left', padx=5)
+        self.combo_filtro_tipo = self.crear_filtro_combo(fila2, 'tipo', "Tipo:", TIPOS)
+        self.combo_filtro_estado = self.crear_filtro_combo(fila2, 'estado', "Estado:", ESTADOS)
+        self.entry_filtro_persona = self.crear_filtro_texto(fila2, 'persona', "Persona:")
         
         ttk.Button(fila2, text="Aplicar Filtros", 
                   command=self.aplicar_filtros).pack(side='left', padx=5)
@@ -282,14 +226,11 @@ class VentanaPrincipal:
         scroll_x = ttk.Scrollbar(frame_tabla, orient='horizontal')
         
         # Treeview
-        self.tree = ttk.Treeview(frame_tabla, 
-                                 columns=('Codigo', 'Tipo', 'Articulo', 'Persona', 
-                                         'Fecha', 'Estado', 'Notas'),
-                                 show='headings',
-                                 yscrollcommand=scroll_y.set,
-                                 xscrollcommand=scroll_x.set)
-        
-        scroll_y.config(command=self.tree.yview)
+        self.crear_tabla(ttk.Treeview(frame_tabla, 
+                                      columns=('Codigo', 'Tipo', 'Articulo', 'Persona', 
+                                              'Fecha', 'Estado', 'Notas'),
+                                      show='headings',
+                                      xscrollcommand=scroll_x.set), scroll_y)
         scroll_x.config(command=self.tree.xview)
         
         # Configurar columnas
@@ -332,8 +273,7 @@ class VentanaPrincipal:
         ttk.Label(frame_botones, text="Cambiar estado a:").pack(side='left', padx=5)
         
         self.combo_nuevo_estado = ttk.Combobox(frame_botones, 
-                                              values=['Prestado', 'Devuelto', 'No devuelto',
-                                                     'Pendiente', 'En proceso', 'Completado', 'Cancelado'],
+                                              values=ESTADOS,
                                               width=15)
         self.combo_nuevo_estado.set('Devuelto')
         self.combo_nuevo_estado.pack(side='left', padx=5)
@@ -350,6 +290,8 @@ class VentanaPrincipal:
         
         ttk.Button(frame_botones, text="✏️ Editar Registro", 
                   command=self.editar_seleccionado).pack(side='left', padx=10)
+        
+        self.crear_botones_historial(frame_botones)
     
     def registrar_nuevo(self):
         tipo = self.combo_tipo.get()
@@ -374,89 +316,8 @@ class VentanaPrincipal:
         self.entry_fecha.set_date(datetime.now())
         self.actualizar_estado_sugerido()
         
-        self.actualizar_tabla()
-        
         messagebox.showinfo("Éxito", f"Registro creado con código:\n{codigo}")
     
-    def buscar_registro(self):
-        codigo = self.entry_buscar.get().strip().upper()
-        if not codigo:
-            messagebox.showwarning("Advertencia", "Ingresa un código para buscar")
-            return
-        
-        resultado = self.sistema.buscar(codigo)
-        if resultado is None:
-            messagebox.showerror("Error", f"No se encontró el código: {codigo}")
-            return
-        
-        # Limpiar y mostrar resultado
-        self.tree.delete(*self.tree.get_children())
-        for _, row in resultado.iterrows():
-            tipo_row = row['Tipo']
-            if tipo_row == 'Préstamo':
-                tag = 'prestamo'
-            elif tipo_row == 'Encargo':
-                tag = 'encargo'
-            elif tipo_row == 'Proyecto':
-                tag = 'proyecto'
-            else:
-                tag = 'otro'
-            self.tree.insert('', 'end', values=(
-                row['Codigo'], row['Tipo'], row['Articulo'], row['Persona'],
-                row['Fecha'], row['Estado'], row['Notas']
-            ), tags=(tag,))
-    
-    def aplicar_filtros(self):
-        tipo = self.combo_filtro_tipo.get()
-        estado = self.combo_filtro_estado.get()
-        
-        df = self.sistema.obtener_todos()
-        
-        if tipo != 'Todos':
-            df = df[df['Tipo'] == tipo]
-        
-        if estado != 'Todos':
-            df = df[df['Estado'] == estado]
-        
-        self.tree.delete(*self.tree.get_children())
-        for _, row in df.iterrows():
-            tipo_row = row['Tipo']
-            if tipo_row == 'Préstamo':
-                tag = 'prestamo'
-            elif tipo_row == 'Encargo':
-                tag = 'encargo'
-            elif tipo_row == 'Proyecto':
-                tag = 'proyecto'
-            else:
-                tag = 'otro'
-            self.tree.insert('', 'end', values=(
-                row['Codigo'], row['Tipo'], row['Articulo'], row['Persona'],
-                row['Fecha'], row['Estado'], row['Notas']
-            ), tags=(tag,))
-    
-    def actualizar_tabla(self):
-        df = self.sistema.obtener_todos()
-        self.tree.delete(*self.tree.get_children())
-        for _, row in df.iterrows():
-            # Asignar tag según el tipo
-            tipo_row = row['Tipo']
-            if tipo_row == 'Préstamo':
-                tag = 'prestamo'
-            elif tipo_row == 'Encargo':
-                tag = 'encargo'
-            elif tipo_row == 'Proyecto':
-                tag = 'proyecto'
-            else:
-                tag = 'otro'
-            self.tree.insert('', 'end', values=(
-                row['Codigo'], row['Tipo'], row['Articulo'], row['Persona'],
-                row['Fecha'], row['Estado'], row['Notas']
-            ), tags=(tag,))
-        
-        # Resetear filtros
-        self.combo_filtro_tipo.set('Todos')
-        self.combo_filtro_estado.set('Todos')
-    
     def cambiar_estado_seleccionado(self):
         seleccion = self.tree.selection()
         if not seleccion:
@@ -464,12 +325,11 @@ class VentanaPrincipal:
             return
         
         item = self.tree.item(seleccion[0])
-        codigo = item['values'][0]
+        codigo = str(item['values'][0])
         nuevo_estado = self.combo_nuevo_estado.get()
         
         if self.sistema.cambiar_estado(codigo, nuevo_estado):
             messagebox.showinfo("Éxito", f"Estado actualizado a: {nuevo_estado}")
-            self.actualizar_tabla()
         else:
             messagebox.showerror("Error", "No se pudo cambiar el estado")
     
@@ -480,7 +340,7 @@ class VentanaPrincipal:
             return
         
         item = self.tree.item(seleccion[0])
-        codigo = item['values'][0]
+        codigo = str(item['values'][0])
         articulo = item['values'][2]
         
         confirmar = messagebox.askyesno("Confirmar Eliminación", 
@@ -491,7 +351,6 @@ class VentanaPrincipal:
         if confirmar:
             if self.sistema.eliminar(codigo):
                 messagebox.showinfo("Éxito", "Registro eliminado correctamente")
-                self.actualizar_tabla()
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el registro")
     
@@ -502,7 +361,7 @@ class VentanaPrincipal:
             return
         
         item = self.tree.item(seleccion[0])
-        codigo = item['values'][0]
+        codigo = str(item['values'][0])
         
         # Copiar al portapapeles
         self.root.clipboard_clear()
@@ -518,7 +377,7 @@ class VentanaPrincipal:
             return
         
         item = self.tree.item(seleccion[0])
-        codigo = item['values'][0]
+        codigo = str(item['values'][0])
         tipo_actual = item['values'][1]
         articulo_actual = item['values'][2]
         persona_actual = item['values'][3]
@@ -538,7 +397,7 @@ class VentanaPrincipal:
         
         # Tipo
         ttk.Label(frame, text="Tipo:", style='Blue.TLabel').grid(row=0, column=0, sticky='w', pady=5)
-        combo_tipo_edit = ttk.Combobox(frame, values=['Préstamo', 'Encargo', 'Proyecto', 'Otro'],
+        combo_tipo_edit = ttk.Combobox(frame, values=TIPOS,
                                        width=37, state='readonly')
         combo_tipo_edit.set(tipo_actual)
         combo_tipo_edit.grid(row=0, column=1, pady=5, padx=10)
@@ -564,8 +423,7 @@ class VentanaPrincipal:
         # Estado
         ttk.Label(frame, text="Estado:", style='Blue.TLabel').grid(row=4, column=0, sticky='w', pady=5)
         combo_estado_edit = ttk.Combobox(frame, 
-                                         values=['Prestado', 'Devuelto', 'No devuelto',
-                                                'Pendiente', 'En proceso', 'Completado', 'Cancelado', 'No echo' , 'Echo' ],
+                                         values=ESTADOS_EDICION,
                                          width=37, state='readonly')
         combo_estado_edit.set(estado_actual)
         combo_estado_edit.grid(row=4, column=1, pady=5, padx=10)
@@ -589,19 +447,26 @@ class VentanaPrincipal:
                 messagebox.showerror("Error", "Artículo y Persona son obligatorios")
                 return
             
+            cambios = {
+                'Tipo': nuevo_tipo,
+                'Articulo': nuevo_articulo,
+                'Persona': nueva_persona,
+                'Estado': nuevo_estado,
+                'Notas': nuevas_notas
+            }
+            # Una fecha vieja escrita como texto se conserva si no se toca
+            if nueva_fecha != fecha_actual:
+                try:
+                    cambios['Fecha'] = validar_fecha(nueva_fecha)
+                except ValueError:
+                    messagebox.showerror("Error", "La fecha debe tener el formato dd/mm/aaaa (por ejemplo 05/03/2024)")
+                    return
+            
             # Actualizar el registro
-            indice = self.sistema.df[self.sistema.df['Codigo'] == codigo].index[0]
-            self.sistema.df.loc[indice, 'Tipo'] = nuevo_tipo
-            self.sistema.df.loc[indice, 'Articulo'] = nuevo_articulo
-            self.sistema.df.loc[indice, 'Persona'] = nueva_persona
-            self.sistema.df.loc[indice, 'Fecha'] = nueva_fecha
-            self.sistema.df.loc[indice, 'Estado'] = nuevo_estado
-            self.sistema.df.loc[indice, 'Notas'] = nuevas_notas
-            self.sistema.guardar()
+            self.sistema.editar(codigo, cambios)
             
             messagebox.showinfo("Éxito", "Registro actualizado correctamente")
             ventana_editar.destroy()
-            self.actualizar_tabla()
         
         # Botones
         frame_botones = ttk.Frame(frame)
@@ -612,13 +477,9 @@ class VentanaPrincipal:
         ttk.Button(frame_botones, text="Cancelar", 
               command=ventana_editar.destroy, style='Blue.TButton').pack(side='left', padx=5)
 
+def iniciar(archivo=None):
+    """Abre la ventana sobre el libro indicado (por defecto RegistroArticulos.ARCHIVO)"""
+    iniciar_ventana(VentanaPrincipal, archivo)
+
 if __name__ == "__main__":
-    try:
-        root = tk.Tk()
-        app = VentanaPrincipal(root)
-        root.mainloop()
-    except PermissionError as e:
-        root = tk.Tk()
-        root.withdraw()
-        messagebox.showerror("Error de Acceso", str(e))
-        root.destroy()
\ No newline at end of file
+    iniciar()
\ No newline at end of file
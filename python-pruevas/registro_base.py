@@ -0,0 +1,1442 @@
+"""Núcleo compartido de los registros guardados en libros de Excel.
+
+RegistroBase implementa carga por bloques, índices, buffer de filas nuevas,
+historial y guardado para cualquier esquema; cada aplicación solo declara sus
+columnas en una subclase. Este módulo no importa tkinter, así lo pueden usar
+los scripts por lotes y los benchmarks sin abrir ventanas.
+
+pandas, numpy y openpyxl se importan de forma diferida: cargar el módulo es
+instantáneo y el costo de importarlos se paga en el primer uso.
+"""
+import random
+import string
+import json
+import importlib
+import importlib.util
+import queue
+import sys
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: los cerrojos entre procesos van con msvcrt
+    fcntl = None
+    import msvcrt
+
+def importar_diferido(nombre):
+    """Devuelve el módulo sin ejecutarlo; se importa de verdad al leer su primer atributo"""
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.find_spec(nombre)
+    if spec is None:
+        # Igual que import: el error dice qué módulo falta
+        raise ModuleNotFoundError(f"No se encontró el módulo '{nombre}'", name=nombre)
+    cargador = importlib.util.LazyLoader(spec.loader)
+    spec.loader = cargador
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    cargador.exec_module(modulo)
+    return modulo
+
+def precargar(*nombres):
+    """Termina de importar módulos diferidos, p.ej. en otro hilo mientras aparece la ventana.
+    
+    En Python 3.11 la importación diferida no tiene cerrojo: otro hilo no debe
+    usar estos módulos hasta que precargar termine.
+    """
+    for nombre in nombres:
+        importlib.import_module(nombre).__name__
+
+def cargar_modulo(nombre):
+    """Carga uno de los scripts de esta carpeta; tienen guiones en el nombre, así que se cargan por ruta"""
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), nombre)
+    spec = importlib.util.spec_from_file_location(nombre[:-3].replace('-', '_'), ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+pd = importar_diferido('pandas')
+np = importar_diferido('numpy')
+openpyxl = importar_diferido('openpyxl')
+
+FORMATO_FECHA = '%d/%m/%Y'
+# Formatos que se aceptan al leer: siempre el día antes que el mes, o aaaa-mm-dd
+FORMATOS_FECHA = [FORMATO_FECHA, '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S']
+ALFABETO_CODIGOS = string.ascii_uppercase + string.digits
+
+def parsear_fecha(valor):
+    """Convierte una fecha (texto en FORMATOS_FECHA, datetime o Timestamp) a Timestamp; NaT si no se puede.
+    
+    No se adivina el orden: '03-04-2024' es 3 de abril y un texto como 'mañana' da NaT.
+    """
+    if isinstance(valor, str):
+        texto = valor.strip()
+        for formato in FORMATOS_FECHA if texto else []:
+            try:
+                return pd.Timestamp(datetime.strptime(texto, formato))
+            except ValueError:
+                continue
+        return pd.NaT
+    if isinstance(valor, (datetime, np.datetime64)):
+        return pd.Timestamp(valor)
+    return pd.NaT
+
+def parsear_fechas(serie, formato=FORMATO_FECHA):
+    """parsear_fecha para una columna entera; solo va valor por valor con lo que no está en formato"""
+    fechas = pd.to_datetime(serie, format=formato, errors='coerce').astype('datetime64[ns]')
+    otras = fechas.isna() & serie.notna() & (serie.astype(str).str.strip() != '')
+    if otras.any():
+        fechas[otras] = serie[otras].map(parsear_fecha).astype('datetime64[ns]')
+    return fechas
+
+def fecha_o_texto(valor):
+    """Valor de una celda de fecha: Timestamp, NaT si está vacía o el texto tal cual si no es una fecha"""
+    fecha = parsear_fecha(valor)
+    if pd.isna(fecha) and isinstance(valor, str) and valor.strip():
+        return valor
+    return fecha
+
+def fechas_o_texto(serie, formato=FORMATO_FECHA):
+    """Columna de fechas como datetime64; si tiene textos que no son fechas (libros viejos
+    escritos a mano) queda como object con Timestamps y esos textos, para no perderlos al guardar"""
+    fechas = parsear_fechas(serie, formato)
+    textos = (fechas.isna() & serie.notna()).to_numpy(copy=True)
+    if textos.any():
+        # Solo se revisan una por una las celdas con algo que no se pudo leer
+        textos[textos] = [isinstance(valor, str) and bool(valor.strip())
+                          for valor in serie.to_numpy(dtype=object)[textos]]
+    if not textos.any():
+        return fechas
+    return fechas.astype(object).where(~textos, serie)
+
+def validar_fecha(texto):
+    """Fecha escrita a mano en un formulario: solo dd/mm/aaaa; ValueError con cualquier otra cosa"""
+    return datetime.strptime(texto.strip(), FORMATO_FECHA).strftime(FORMATO_FECHA)
+
+def formatear_fecha(valor):
+    if isinstance(valor, str):
+        return valor
+    # NaT también es un datetime: se revisa antes
+    if valor is None or pd.isna(valor):
+        return ''
+    return valor.strftime(FORMATO_FECHA) if isinstance(valor, datetime) else str(valor)
+
+def columna_a_texto(serie):
+    """Columna lista para el Treeview como arreglo de objetos; las fechas ya formateadas"""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        # Hay pocas fechas distintas: se formatea cada una una vez y se reparte por código
+        codigos, unicas = pd.factorize(serie)
+        tabla = np.array([fecha.strftime(FORMATO_FECHA) for fecha in unicas] + [''], dtype=object)
+        return tabla[codigos]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        tabla = np.append(serie.cat.categories.to_numpy(dtype=object), np.nan)
+        return tabla[serie.cat.codes.to_numpy()]
+    if pd.api.types.infer_dtype(serie, skipna=True) in ('datetime', 'mixed'):
+        # Fechas que conservan algún texto que no es fecha (ver fechas_o_texto)
+        return serie.map(formatear_fecha).to_numpy(dtype=object)
+    return serie.to_numpy(dtype=object)
+
+def buscar_tags(serie, tags, defecto):
+    """Tag de cada valor de la serie con una tabla indexada por el código de categoría"""
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype('category')
+    # El código -1 (valor vacío) cae en la última posición, la del tag por defecto
+    tabla = np.array([tags.get(valor, defecto) for valor in serie.cat.categories] + [defecto],
+                     dtype=object)
+    return tabla[serie.cat.codes.to_numpy()]
+
+class TrabajadorSegundoPlano:
+    """Hilo que corre tareas fuera del hilo de Tk, como guardar el libro o filtrar.
+    
+    Solo se guarda la petición más reciente: si llegan varias mientras se está
+    trabajando, se juntan en una sola tarea con los últimos argumentos.
+    Los errores quedan en la cola `errores` para que la interfaz los muestre.
+    """
+    def __init__(self):
+        self.condicion = threading.Condition()
+        self.pendiente = None
+        self.trabajando = False
+        self.errores = queue.Queue()
+        self.hilo = threading.Thread(target=self.trabajar, daemon=True)
+        self.hilo.start()
+    
+    def solicitar(self, funcion, *args):
+        with self.condicion:
+            self.pendiente = (funcion, args)
+            self.condicion.notify_all()
+    
+    def ocupado(self):
+        with self.condicion:
+            return self.pendiente is not None or self.trabajando
+    
+    def esperar(self):
+        with self.condicion:
+            while self.pendiente is not None or self.trabajando:
+                self.condicion.wait()
+    
+    def trabajar(self):
+        while True:
+            with self.condicion:
+                while self.pendiente is None:
+                    self.condicion.wait()
+                funcion, args = self.pendiente
+                self.pendiente = None
+                self.trabajando = True
+            try:
+                funcion(*args)
+            except Exception as e:
+                self.errores.put(e)
+            finally:
+                with self.condicion:
+                    self.trabajando = False
+                    self.condicion.notify_all()
+    
+    def errores_pendientes(self):
+        errores = []
+        while not self.errores.empty():
+            errores.append(self.errores.get())
+        return errores
+
+def leer_libro_por_bloques(archivo, tamano_bloque):
+    """Lee la primera hoja fila por fila (openpyxl en modo solo lectura) y devuelve DataFrames de tamano_bloque filas.
+    
+    En memoria nunca hay más que un bloque de celdas sin convertir, sea cual sea el tamaño del libro.
+    """
+    libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return
+        columnas = [str(columna) for columna in encabezado]
+        bloque = []
+        for fila in filas:
+            # Las filas vacías del final del libro no son registros
+            if all(valor is None for valor in fila):
+                continue
+            bloque.append(fila)
+            if len(bloque) == tamano_bloque:
+                yield crear_bloque(bloque, columnas)
+                bloque = []
+        if bloque:
+            yield crear_bloque(bloque, columnas)
+    finally:
+        libro.close()
+
+def crear_bloque(filas, columnas):
+    df = pd.DataFrame.from_records(filas, columns=columnas)
+    if 'Codigo' in df.columns:
+        # Igual que dtype={'Codigo': str}: un código numérico sigue siendo texto
+        df['Codigo'] = df['Codigo'].where(df['Codigo'].isna(), df['Codigo'].astype(str))
+    return df
+
+class CacheBinaria:
+    """Copia Feather del libro para arrancar rápido; sin pyarrow no hay caché.
+    
+    Solo se usa si coincide con la fecha de modificación y el tamaño actuales del xlsx.
+    No hay alternativa con pickle: el libro puede estar en una carpeta compartida
+    y leer un pickle ajeno ejecutaría su código.
+    """
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.activa = importlib.util.find_spec('pyarrow') is not None
+        self.ruta = f"{archivo}.cache.feather"
+        self.ruta_meta = f"{archivo}.cache.json"
+    
+    def firma_libro(self):
+        estado = os.stat(self.archivo)
+        return {'mtime_ns': estado.st_mtime_ns, 'tamano': estado.st_size, 'formato': 'feather'}
+    
+    def cargar(self):
+        """Devuelve el DataFrame de la caché o None si no existe o está desactualizada"""
+        if not self.activa:
+            return None
+        try:
+            with open(self.ruta_meta, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta != self.firma_libro():
+                return None
+            return pd.read_feather(self.ruta)
+        except (OSError, ValueError):
+            return None
+    
+    def guardar(self, df, firma):
+        """Guarda df como copia del libro que tenía la firma dada.
+        
+        La firma se toma antes de leer el libro (o justo después de escribirlo): si
+        el libro ya cambió, df es de la versión anterior y no se guarda.
+        """
+        if not self.activa:
+            return
+        try:
+            if firma != self.firma_libro():
+                return
+            # Sin la meta la caché queda inválida mientras se reemplazan los datos
+            if os.path.exists(self.ruta_meta):
+                os.remove(self.ruta_meta)
+            df = df.reset_index(drop=True)
+            df.to_feather(self.ruta)
+            with open(self.ruta_meta, 'w', encoding='utf-8') as f:
+                json.dump(firma, f)
+        except Exception:
+            # La caché es opcional: si no se puede escribir se volverá a leer el xlsx
+            if os.path.exists(self.ruta_meta):
+                os.remove(self.ruta_meta)
+
+class CerrojoArchivo:
+    """Cerrojo exclusivo entre procesos sobre un archivo auxiliar (fcntl o msvcrt).
+    
+    Se usa con `with` para esperar el cerrojo, o con adquirir(esperar=False) para
+    probar si otro proceso lo tiene.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.archivo = None
+    
+    def adquirir(self, esperar=True):
+        archivo = open(self.ruta, 'a+b')
+        try:
+            if fcntl is not None:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | (0 if esperar else fcntl.LOCK_NB))
+            else:
+                archivo.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK if esperar else msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK se rinde después de diez intentos; se sigue esperando
+                        if not esperar:
+                            raise
+        except OSError:
+            archivo.close()
+            return False
+        self.archivo = archivo
+        return True
+    
+    def liberar(self):
+        if self.archivo is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self.archivo.fileno(), fcntl.LOCK_UN)
+        else:
+            self.archivo.seek(0)
+            msvcrt.locking(self.archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        self.archivo.close()
+        self.archivo = None
+    
+    def __enter__(self):
+        self.adquirir()
+        return self
+    
+    def __exit__(self, *args):
+        self.liberar()
+
+class VersionLibro:
+    """Sello de versión del libro compartido: un contador en archivo.version más la firma del xlsx.
+    
+    Cada proceso recuerda la versión sobre la que trabaja; si al guardar ya no
+    coincide, otro proceso escribió el libro en el medio.
+    """
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.ruta = archivo + '.version'
+        self.conocida = None
+    
+    def leer(self):
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                contador = int(f.read())
+        except (OSError, ValueError):
+            contador = 0
+        try:
+            estado = os.stat(self.archivo)
+            firma = (estado.st_mtime_ns, estado.st_size)
+        except OSError:
+            firma = None
+        return contador, firma
+    
+    def cambio(self):
+        return self.leer() != self.conocida
+    
+    def recordar(self):
+        self.conocida = self.leer()
+    
+    def avanzar(self):
+        """Se llama con el cerrojo del libro tomado, justo después de escribirlo"""
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(str(self.leer()[0] + 1))
+        os.replace(temporal, self.ruta)
+        self.recordar()
+
+class AlmacenExcel:
+    """Guarda el registro reescribiendo el libro completo en cada cambio.
+    
+    Varios procesos pueden compartir el libro: cada escritura se hace con el
+    cerrojo archivo.lock tomado, y si otro proceso guardó desde la última vez se
+    recarga su libro y se vuelven a aplicar encima los cambios propios, fila por
+    Codigo y columna por columna. Si los dos cambiaron la misma celda gana el
+    último en guardar. Leer no toma el cerrojo: el libro se reemplaza de forma atómica.
+    """
+    def __init__(self, archivo, escritor=None):
+        self.archivo = archivo
+        self.escritor = escritor
+        self.cache = CacheBinaria(archivo)
+        self.version = VersionLibro(archivo)
+        self.cerrojo = CerrojoArchivo(archivo + '.lock')
+        self.cambios = []
+    
+    def cargar_por_bloques(self, tamano_bloque):
+        """Devuelve el contenido guardado como DataFrames: la caché de una vez o el libro por bloques"""
+        # La versión se toma antes de leer: si cambia en el medio se notará al guardar
+        self.version.recordar()
+        self.leido_del_libro = False
+        if not os.path.exists(self.archivo):
+            return
+        df = self.cache.cargar()
+        if df is not None:
+            yield df
+            return
+        self.leido_del_libro = True
+        # Firma del libro que se va a leer; la caché solo se guarda si sigue igual al terminar
+        self.firma_leida = self.cache.firma_libro()
+        try:
+            # Las celdas vacías llegan como None y 'N/A' queda como texto
+            yield from leer_libro_por_bloques(self.archivo, tamano_bloque)
+        except PermissionError:
+            raise PermissionError(
+                f"El archivo '{self.archivo}' está abierto en otro programa.\n"
+                "Por favor ciérralo y vuelve a intentar."
+            )
+    
+    def terminar_carga(self, df):
+        """Si hubo que leer el libro, lo guarda en la caché para arrancar desde ella la próxima vez"""
+        # Los que escriben el libro también escriben la caché con el cerrojo tomado.
+        # Si está ocupado (o es este mismo proceso recargando dentro de sincronizar)
+        # no se espera: quien lo tiene dejará la caché al día.
+        if not self.leido_del_libro or not self.cerrojo.adquirir(esperar=False):
+            return
+        try:
+            self.cache.guardar(df, self.firma_leida)
+        finally:
+            self.cerrojo.liberar()
+    
+    def pendientes(self):
+        """Cambios registrados que todavía no están en el libro"""
+        return [{'op': operacion, 'codigo': codigo, 'datos': datos}
+                for operacion, codigo, datos in self.cambios]
+    
+    def registrar(self, registro, operacion, codigo, datos=None):
+        self.registrar_lote(registro, [(operacion, codigo, datos)])
+    
+    def registrar_lote(self, registro, cambios):
+        self.cambios.extend(cambios)
+        self.guardar(registro)
+    
+    def guardar(self, registro):
+        if self.escritor is not None:
+            self.escritor.solicitar(self.sincronizar, registro)
+        else:
+            self.sincronizar(registro)
+    
+    def sincronizar(self, registro, escribir=True):
+        """Trae lo que guardaron otros procesos y, si escribir, guarda el estado propio"""
+        with self.cerrojo:
+            with registro.cerrojo:
+                if self.version.cambio():
+                    registro.recargar()
+                if not escribir:
+                    return
+                escritos = self.preparar_escritura()
+                copia = registro.df.copy()
+            self.escribir(copia)
+            self.version.avanzar()
+            self.terminar_escritura(escritos)
+    
+    def preparar_escritura(self):
+        # Los cambios que lleguen mientras se escribe quedan para la próxima vez
+        return len(self.cambios)
+    
+    def terminar_escritura(self, escritos):
+        del self.cambios[:escritos]
+    
+    def revisar(self, registro):
+        """Si otro proceso guardó el libro, se recarga en segundo plano"""
+        if not self.version.cambio():
+            return
+        if self.escritor is None:
+            self.sincronizar(registro, escribir=False)
+        elif not self.escritor.ocupado():
+            self.escritor.solicitar(self.sincronizar, registro, False)
+    
+    def escribir(self, df):
+        base, extension = os.path.splitext(self.archivo)
+        temporal = f"{base}.tmp{extension}"
+        try:
+            # Las fechas se guardan como fechas de Excel con el mismo formato del DateEntry
+            with pd.ExcelWriter(temporal, date_format='DD/MM/YYYY', datetime_format='DD/MM/YYYY') as writer:
+                df.to_excel(writer, index=False)
+            os.replace(temporal, self.archivo)
+        except PermissionError:
+            raise PermissionError(
+                f"No se puede guardar '{self.archivo}'.\n"
+                "El archivo está abierto en otro programa. Ciérralo e intenta de nuevo."
+            )
+        # Con el cerrojo tomado nadie más reemplaza el libro entre la escritura y la firma
+        self.cache.guardar(df, self.cache.firma_libro())
+    
+    def errores_pendientes(self):
+        return [] if self.escritor is None else self.escritor.errores_pendientes()
+    
+    def cerrar(self, registro):
+        if self.escritor is not None:
+            self.escritor.esperar()
+            self.escritor.errores_pendientes()
+        if self.cambios:
+            # La última escritura falló o no llegó a hacerse: se reintenta aquí para poder avisar
+            self.sincronizar(registro)
+
+class AlmacenDiario(AlmacenExcel):
+    """Agrega cada cambio a un diario y solo regenera el libro al compactar.
+    
+    Cada proceso tiene su propio diario (archivo.<sesión>.diario) y mantiene
+    tomado su cerrojo mientras vive. Al arrancar se adoptan los diarios cuyo
+    cerrojo está libre: son de sesiones que se cerraron de golpe.
+    """
+    def __init__(self, archivo, limite_compactacion=500, escritor=None):
+        # La compactación automática siempre se hace en segundo plano
+        super().__init__(archivo, escritor if escritor is not None else TrabajadorSegundoPlano())
+        self.sesion = f"{os.getpid()}-{random.SystemRandom().getrandbits(32):08x}"
+        self.diario, self.compactando, ruta_cerrojo = self.rutas_sesion(self.sesion)
+        self.cerrojo_sesion = CerrojoArchivo(ruta_cerrojo)
+        self.cerrojo_sesion.adquirir()
+        self.limite_compactacion = limite_compactacion
+        self.entradas = 0
+        self.lock = threading.Lock()
+    
+    def rutas_sesion(self, sesion):
+        diario = f"{self.archivo}.{sesion}.diario"
+        return diario, diario + '.compactando', diario + '.lock'
+    
+    def sesiones_huerfanas(self):
+        carpeta = os.path.dirname(os.path.abspath(self.archivo))
+        prefijo = os.path.basename(self.archivo) + '.'
+        sesiones = set()
+        for nombre in os.listdir(carpeta):
+            resto = nombre[len(prefijo):]
+            # 'archivo.diario' (sin sesión) es el diario heredado, no una sesión
+            if nombre.startswith(prefijo) and '.diario' in resto:
+                sesion = resto.split('.diario')[0]
+                if sesion != self.sesion:
+                    sesiones.add(sesion)
+        return sesiones
+    
+    def adoptar_huerfanos(self):
+        """Pasa a la compactación propia los diarios de sesiones que ya no corren"""
+        # Diarios anteriores a las sesiones, de cuando había un solo proceso
+        heredados = [(self.archivo + '.diario.compactando', self.archivo + '.diario', None)]
+        for sesion in sorted(self.sesiones_huerfanas()):
+            heredados.append(self.rutas_sesion(sesion))
+        for compactando, diario, ruta_cerrojo in heredados:
+            cerrojo = CerrojoArchivo(ruta_cerrojo) if ruta_cerrojo else None
+            if cerrojo is not None and not cerrojo.adquirir(esperar=False):
+                continue  # la sesión sigue abierta en otro proceso
+            try:
+                lineas = ''
+                for ruta in (compactando, diario):
+                    if os.path.exists(ruta):
+                        with open(ruta, 'r', encoding='utf-8') as f:
+                            lineas += f.read()
+                if lineas:
+                    with self.lock:
+                        with open(self.compactando, 'a', encoding='utf-8') as f:
+                            f.write(lineas if lineas.endswith('\n') else lineas + '\n')
+                            f.flush()
+                            os.fsync(f.fileno())
+                for ruta in (compactando, diario):
+                    if os.path.exists(ruta):
+                        os.remove(ruta)
+            finally:
+                if cerrojo is not None:
+                    cerrojo.liberar()
+                    os.remove(ruta_cerrojo)
+    
+    def leer_diario(self, ruta):
+        if not os.path.exists(ruta):
+            return []
+        entradas = []
+        with open(ruta, 'r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    entradas.append(json.loads(linea))
+                except json.JSONDecodeError:
+                    # Línea incompleta por un cierre inesperado: se descarta
+                    continue
+        return entradas
+    
+    def pendientes(self):
+        self.adoptar_huerfanos()
+        entradas = self.leer_diario(self.compactando) + self.leer_diario(self.diario)
+        self.entradas = len(entradas)
+        return entradas
+    
+    def registrar_lote(self, registro, cambios):
+        # Un solo write y un solo fsync para todo el lote
+        lineas = ''.join(
+            json.dumps({'op': operacion, 'codigo': codigo, 'datos': datos},
+                       ensure_ascii=False, default=str) + '\n'
+            for operacion, codigo, datos in cambios
+        )
+        with self.lock:
+            with open(self.diario, 'a', encoding='utf-8') as f:
+                f.write(lineas)
+                f.flush()
+                os.fsync(f.fileno())
+            self.entradas += len(cambios)
+        
+        if self.entradas >= self.limite_compactacion:
+            self.compactar(registro, en_segundo_plano=True)
+    
+    def rotar_diario(self):
+        # Lo que ya estaba compactándose (p.ej. un intento fallido) se conserva
+        with self.lock:
+            if os.path.exists(self.diario):
+                if os.path.exists(self.compactando):
+                    with open(self.diario, 'r', encoding='utf-8') as origen, \
+                         open(self.compactando, 'a', encoding='utf-8') as destino:
+                        destino.write(origen.read())
+                    os.remove(self.diario)
+                else:
+                    os.replace(self.diario, self.compactando)
+            self.entradas = 0
+    
+    def compactar(self, registro, en_segundo_plano=False):
+        """Regenera el libro con el estado actual y vacía el diario"""
+        # No se rota el diario mientras otra compactación sigue escribiendo,
+        # porque al terminar borraría entradas que su copia no incluye
+        if en_segundo_plano and self.escritor.ocupado():
+            return
+        self.escritor.esperar()
+        
+        if en_segundo_plano:
+            self.escritor.solicitar(self.sincronizar, registro)
+        else:
+            self.sincronizar(registro)
+    
+    def preparar_escritura(self):
+        # Se rota con el registro bloqueado: la copia que se escribe tiene todo lo rotado
+        self.rotar_diario()
+    
+    def terminar_escritura(self, escritos):
+        # Si la escritura falla, el diario rotado se conserva y se reintenta en la siguiente compactación
+        with self.lock:
+            if os.path.exists(self.compactando):
+                os.remove(self.compactando)
+    
+    def guardar(self, registro):
+        self.compactar(registro)
+    
+    def cerrar(self, registro):
+        self.escritor.esperar()
+        self.escritor.errores_pendientes()
+        if self.entradas or os.path.exists(self.compactando):
+            self.compactar(registro)
+        self.cerrojo_sesion.liberar()
+        for ruta in (self.diario, self.cerrojo_sesion.ruta):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+class IndiceTexto:
+    """Índice invertido de trigramas para buscar por parte de un texto sin recorrer la columna.
+    
+    Se indexan los textos distintos y no las filas: un nombre que aparece en mil
+    trabajos ocupa una sola entrada por trigrama.
+    """
+    
+    def __init__(self):
+        self.trigramas = defaultdict(set)  # trigrama -> textos que lo contienen
+        self.etiquetas = {}                # texto -> etiquetas de las filas con ese texto
+        self.textos = {}                   # etiqueta -> texto
+    
+    @staticmethod
+    def normalizar(valor):
+        return str(valor).casefold()
+    
+    @staticmethod
+    def trigramas_de(texto):
+        return {texto[i:i + 3] for i in range(len(texto) - 2)}
+    
+    def construir(self, etiquetas, valores):
+        for etiqueta, valor in zip(etiquetas, valores):
+            self.agregar(etiqueta, valor)
+    
+    def agregar(self, etiqueta, valor):
+        """Indexa (o reindexa) el valor de una fila"""
+        self.quitar(etiqueta)
+        if pd.isna(valor) or valor == '':
+            return
+        texto = self.normalizar(valor)
+        self.textos[etiqueta] = texto
+        etiquetas = self.etiquetas.get(texto)
+        if etiquetas is None:
+            etiquetas = self.etiquetas[texto] = set()
+            for trigrama in self.trigramas_de(texto):
+                self.trigramas[trigrama].add(texto)
+        etiquetas.add(etiqueta)
+    
+    def quitar(self, etiqueta):
+        texto = self.textos.pop(etiqueta, None)
+        if texto is None:
+            return
+        etiquetas = self.etiquetas[texto]
+        etiquetas.discard(etiqueta)
+        if not etiquetas:
+            del self.etiquetas[texto]
+            for trigrama in self.trigramas_de(texto):
+                textos = self.trigramas[trigrama]
+                textos.discard(texto)
+                if not textos:
+                    del self.trigramas[trigrama]
+    
+    def buscar(self, consulta):
+        """Etiquetas de las filas cuyo texto contiene la consulta, sin distinguir mayúsculas"""
+        consulta = self.normalizar(consulta)
+        if len(consulta) < 3:
+            # Sin trigramas que cruzar se revisan los textos distintos, no las filas
+            candidatos = self.etiquetas
+        else:
+            listas = sorted((self.trigramas.get(trigrama, set())
+                             for trigrama in self.trigramas_de(consulta)), key=len)
+            candidatos = listas[0].intersection(*listas[1:])
+        resultado = set()
+        for texto in candidatos:
+            # Tener todos los trigramas no asegura que estén seguidos
+            if consulta in texto:
+                resultado.update(self.etiquetas[texto])
+        return resultado
+
+class IndiceFechas:
+    """Etiquetas de fila ordenadas por fecha para responder rangos con búsqueda binaria.
+    
+    Las filas sin fecha no entran. Un cambio suelto se inserta o se quita en su
+    lugar; para lotes grandes el registro descarta el índice y lo vuelve a armar.
+    """
+    
+    def __init__(self, etiquetas, fechas):
+        fechas = pd.Series(fechas, index=etiquetas).dropna().sort_values(kind='stable')
+        self.fechas = fechas.to_numpy(dtype='datetime64[ns]')
+        self.etiquetas = fechas.index.to_numpy(dtype=np.int64)
+    
+    @staticmethod
+    def valor(fecha):
+        return np.datetime64(pd.Timestamp(fecha).value, 'ns')
+    
+    def agregar(self, etiqueta, fecha):
+        if pd.isna(fecha):
+            return
+        fecha = self.valor(fecha)
+        posicion = np.searchsorted(self.fechas, fecha, side='right')
+        self.fechas = np.insert(self.fechas, posicion, fecha)
+        self.etiquetas = np.insert(self.etiquetas, posicion, etiqueta)
+    
+    def quitar(self, etiqueta, fecha):
+        if pd.isna(fecha):
+            return
+        fecha = self.valor(fecha)
+        # Solo se revisan las filas con la misma fecha
+        inicio = np.searchsorted(self.fechas, fecha, side='left')
+        fin = np.searchsorted(self.fechas, fecha, side='right')
+        posiciones = inicio + np.flatnonzero(self.etiquetas[inicio:fin] == etiqueta)
+        self.fechas = np.delete(self.fechas, posiciones)
+        self.etiquetas = np.delete(self.etiquetas, posiciones)
+    
+    def entre(self, desde=None, antes_de=None):
+        """Etiquetas con desde <= fecha < antes_de, en orden de fecha; None deja el extremo abierto"""
+        inicio = 0 if desde is None else np.searchsorted(self.fechas, self.valor(desde), side='left')
+        fin = len(self.fechas) if antes_de is None else np.searchsorted(self.fechas, self.valor(antes_de), side='left')
+        return self.etiquetas[inicio:max(inicio, fin)]
+
+class HistorialCambios:
+    """Deshacer y rehacer guardando la operación inversa de cada cambio, no copias del DataFrame.
+    
+    Cada entrada es un par (cambios, inversos) de listas de (operacion, codigo, datos);
+    un lote cuenta como una sola entrada. Se conservan las últimas `limite` entradas y
+    como mucho `maximo_operaciones` operaciones entre todas: un lote más grande que eso
+    no se puede deshacer y vacía el historial.
+    """
+    def __init__(self, limite=100, maximo_operaciones=100000):
+        self.limite = limite
+        self.maximo_operaciones = maximo_operaciones
+        self.para_deshacer = deque()
+        self.para_rehacer = []
+        self.operaciones = 0
+    
+    def anotar(self, cambios, inversos):
+        """Un cambio nuevo: lo que se había deshecho ya no se puede rehacer"""
+        self.para_rehacer = []
+        if len(cambios) > self.maximo_operaciones:
+            self.para_deshacer.clear()
+            self.operaciones = 0
+            return
+        self.apilar(cambios, inversos)
+    
+    def apilar(self, cambios, inversos):
+        self.para_deshacer.append((cambios, inversos))
+        self.operaciones += len(cambios)
+        while len(self.para_deshacer) > self.limite or self.operaciones > self.maximo_operaciones:
+            viejos, _ = self.para_deshacer.popleft()
+            self.operaciones -= len(viejos)
+    
+    def sacar_para_deshacer(self):
+        """Operaciones que revierten la última entrada, o None si no hay"""
+        if not self.para_deshacer:
+            return None
+        cambios, inversos = self.para_deshacer.pop()
+        self.operaciones -= len(cambios)
+        self.para_rehacer.append((cambios, inversos))
+        # Se deshace en el orden contrario al que se hizo
+        return inversos[::-1]
+    
+    def sacar_para_rehacer(self):
+        if not self.para_rehacer:
+            return None
+        cambios, inversos = self.para_rehacer.pop()
+        self.apilar(cambios, inversos)
+        return cambios
+    
+    def puede_deshacer(self):
+        return bool(self.para_deshacer)
+    
+    def puede_rehacer(self):
+        return bool(self.para_rehacer)
+
+class AsignadorCodigosBase:
+    """Códigos de 8 caracteres sacados de un contador que solo avanza.
+    
+    Cada número pasa por una red de Feistel sobre dos mitades de 4 caracteres,
+    que es una permutación de todo el espacio de códigos: dos números distintos
+    nunca dan el mismo código y no hace falta recordar los ya usados. Las
+    subclases guardan el contador compartido y lo reservan por bloques.
+    """
+    LARGO = 8
+    RONDAS = 4
+    BLOQUE = 64
+    MITAD = len(ALFABETO_CODIGOS) ** (LARGO // 2)
+    
+    def __init__(self):
+        self.siguiente = 0
+        self.limite = 0  # números ya reservados: [siguiente, limite)
+        self.claves = None
+    
+    def reservar(self, cantidad):
+        """Avanza el contador compartido y devuelve (inicio, fin, clave) del rango reservado"""
+        raise NotImplementedError
+    
+    def preparar(self, cantidad):
+        """Deja al menos cantidad números reservados con una sola visita al contador"""
+        if self.limite - self.siguiente < cantidad:
+            self.siguiente, self.limite, clave = self.reservar(max(cantidad, self.BLOQUE))
+            if self.limite > self.MITAD ** 2:
+                raise ValueError("Se agotaron los códigos del registro")
+            generador = random.Random(clave)
+            self.claves = [generador.randrange(self.MITAD) for _ in range(self.RONDAS)]
+    
+    def siguiente_codigo(self):
+        self.preparar(1)
+        numero = self.siguiente
+        self.siguiente += 1
+        return self.codificar(numero)
+    
+    def codificar(self, numero):
+        izquierda, derecha = divmod(numero, self.MITAD)
+        for clave in self.claves:
+            # Cualquier función sirve como ronda: la red de Feistel es invertible igual
+            mezcla = (derecha * 2654435761 + clave) % 4294967291 % self.MITAD
+            izquierda, derecha = derecha, (izquierda + mezcla) % self.MITAD
+        numero = izquierda * self.MITAD + derecha
+        caracteres = []
+        for _ in range(self.LARGO):
+            numero, resto = divmod(numero, len(ALFABETO_CODIGOS))
+            caracteres.append(ALFABETO_CODIGOS[resto])
+        return ''.join(reversed(caracteres))
+
+class AsignadorCodigos(AsignadorCodigosBase):
+    """Contador en un archivo junto al registro, reservado bajo un cerrojo entre procesos"""
+    
+    def __init__(self, archivo):
+        super().__init__()
+        self.ruta = archivo + '.contador'
+    
+    def reservar(self, cantidad):
+        with CerrojoArchivo(self.ruta + '.lock'):
+            if os.path.exists(self.ruta):
+                with open(self.ruta, 'r', encoding='utf-8') as f:
+                    estado = json.load(f)
+            else:
+                # La clave hace que cada registro tenga su propia secuencia de códigos
+                estado = {'siguiente': 0, 'clave': random.SystemRandom().getrandbits(64)}
+            inicio = estado['siguiente']
+            estado['siguiente'] = inicio + cantidad
+            temporal = self.ruta + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump(estado, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, self.ruta)
+        return inicio, inicio + cantidad, estado['clave']
+
+
+class RegistroBase:
+    """Registro en un DataFrame descrito por su esquema y guardado a través de un almacén.
+    
+    Cada aplicación declara en una subclase el libro, las columnas, la clave y
+    qué columnas son categóricas, fechas o de búsqueda por texto. La carga por
+    bloques, los índices, el buffer de filas nuevas, el historial y el guardado
+    son los mismos para todas. El almacén decide cómo se guarda cada cambio:
+    AlmacenExcel reescribe el libro y AlmacenDiario lo agrega a un diario.
+    """
+    ARCHIVO = 'registro.xlsx'
+    COLUMNAS = []
+    CLAVE = 'Codigo'
+    # None: categoría sin lista fija, se toman los valores que aparezcan
+    COLUMNAS_CATEGORICAS = {}
+    COLUMNAS_FECHA = []
+    # Columnas con búsqueda por parte del texto; cada índice se arma en su primera búsqueda
+    COLUMNAS_TEXTO = []
+    # Filtros de la vista: argumento de filtrar -> columna; las de COLUMNAS_TEXTO buscan por parte del texto
+    COLUMNAS_FILTRO = {}
+    # Fecha con índice ordenado para consultas por rango; None si el registro no lo usa
+    COLUMNA_FECHA_INDEXADA = None
+    # Máscaras de filtro que se conservan entre búsquedas
+    MAXIMO_MASCARAS = 32
+    # obtener_todos devuelve el propio DataFrame sin copiarlo, así que la vista puede compartirlo
+    EN_MEMORIA = True
+    # Filas nuevas que se acumulan antes de unirlas al DataFrame
+    TAMANO_BLOQUE = 4096
+    # Filas del libro que se leen y convierten de una vez al cargar
+    TAMANO_BLOQUE_LECTURA = 5000
+    
+    def __init__(self, archivo=None, almacen=None, en_segundo_plano=False):
+        """Con en_segundo_plano el libro se lee en otro hilo y self.df va mostrando lo ya leído"""
+        self.archivo = archivo if archivo is not None else self.ARCHIVO
+        self.almacen = almacen if almacen is not None else self.crear_almacen()
+        self.asignador = AsignadorCodigos(self.archivo)
+        self.indice = {}
+        self.indices_texto = {}
+        self.mascaras = {}
+        # Los filtros corren en otro hilo; el cerrojo los separa de los cambios
+        self.cerrojo = threading.RLock()
+        self.observadores = []
+        self.historial = HistorialCambios()
+        self.recargado = False
+        self.cargado = threading.Event()
+        self.error_carga = None
+        self.filas_leidas = 0
+        self.publicaciones = 0
+        self.reiniciar_datos()
+        if en_segundo_plano:
+            threading.Thread(target=self.cargar_en_segundo_plano, daemon=True).start()
+        else:
+            self.cargar_datos()
+            self.cargado.set()
+    
+    def crear_almacen(self):
+        return AlmacenDiario(self.archivo)
+    
+    @property
+    def df(self):
+        # Cualquier lectura ve también las filas que siguen en el buffer y no ve las eliminadas
+        if self.buffer_filas or self.eliminadas:
+            with self.cerrojo:
+                if self.buffer_filas:
+                    self.volcar_buffer()
+                if self.eliminadas:
+                    self.quitar_eliminadas()
+        return self._df
+    
+    @df.setter
+    def df(self, valor):
+        self._df = valor
+    
+    def reiniciar_buffer(self):
+        self.buffer = {columna: np.empty(self.TAMANO_BLOQUE, dtype=object)
+                       for columna in self.COLUMNAS}
+        self.buffer_etiquetas = np.empty(self.TAMANO_BLOQUE, dtype=np.int64)
+        self.buffer_filas = 0
+        # Etiquetas eliminadas que siguen en el DataFrame hasta la próxima lectura
+        self.eliminadas = []
+    
+    def agregar_al_buffer(self, etiqueta, datos):
+        if self.buffer_filas == self.TAMANO_BLOQUE:
+            self.volcar_buffer()
+        
+        posicion = self.buffer_filas
+        for columna in self.COLUMNAS:
+            self.buffer[columna][posicion] = datos.get(columna, '')
+        self.buffer_etiquetas[posicion] = etiqueta
+        self.buffer_filas += 1
+    
+    def volcar_buffer(self):
+        """Une las filas acumuladas al DataFrame con un solo concat"""
+        filas = self.buffer_filas
+        # Se copian los arreglos porque el buffer se reutiliza en el siguiente bloque
+        bloque = pd.DataFrame({columna: self.buffer[columna][:filas].copy() for columna in self.COLUMNAS},
+                              index=self.buffer_etiquetas[:filas].copy())
+        self.buffer_filas = 0
+        # El bloque toma los mismos tipos que el DataFrame para que concat no vuelva a object
+        for columna in self.COLUMNAS_CATEGORICAS:
+            self.agregar_categorias(columna, bloque[columna].dropna().unique())
+        for columna in self.COLUMNAS_FECHA:
+            bloque[columna] = fechas_o_texto(bloque[columna])
+            if bloque[columna].dtype == object:
+                self.admitir_texto(columna)
+        # Un libro editado a mano puede traer columnas de más: esas quedan vacías en las filas nuevas
+        bloque = bloque.astype({columna: tipo for columna, tipo in self._df.dtypes.items() if columna in bloque})
+        if len(self._df) == 0:
+            self._df = bloque
+        else:
+            self._df = pd.concat([self._df, bloque])
+    
+    def quitar_eliminadas(self):
+        """Saca del DataFrame las filas eliminadas con un solo drop, como volcar_buffer con las nuevas"""
+        eliminadas, self.eliminadas = self.eliminadas, []
+        self._df = self._df.drop(eliminadas)
+    
+    def aplicar_tipos(self, df):
+        """Columnas de pocos valores como categóricas y fechas como datetime64"""
+        # A un libro editado a mano le puede faltar una columna: se agrega vacía
+        faltantes = [columna for columna in self.COLUMNAS if columna not in df.columns]
+        if faltantes:
+            df = df.assign(**{columna: None for columna in faltantes})
+        for columna, conocidas in self.COLUMNAS_CATEGORICAS.items():
+            conocidas = list(conocidas or [])
+            if isinstance(df[columna].dtype, pd.CategoricalDtype):
+                faltantes = [c for c in conocidas if c not in df[columna].cat.categories]
+                df[columna] = df[columna].cat.add_categories(faltantes)
+            else:
+                valores = df[columna].astype(object).where(df[columna].isna(), df[columna].astype(str))
+                extra = sorted(set(valores.dropna().unique()) - set(conocidas))
+                df[columna] = pd.Categorical(valores, categories=conocidas + extra)
+        for columna in self.COLUMNAS_FECHA:
+            if not pd.api.types.is_datetime64_any_dtype(df[columna]):
+                df[columna] = fechas_o_texto(df[columna])
+        return df
+    
+    def agregar_categorias(self, columna, valores):
+        categorias = self._df[columna].cat.categories
+        nuevas = [valor for valor in valores if not pd.isna(valor) and valor not in categorias]
+        if nuevas:
+            self._df[columna] = self._df[columna].cat.add_categories(nuevas)
+    
+    def admitir_texto(self, columna):
+        """Pasa una columna de fechas a object para que pueda guardar un texto que no es fecha"""
+        if pd.api.types.is_datetime64_any_dtype(self._df[columna]):
+            self._df[columna] = self._df[columna].astype(object)
+    
+    def asignar(self, etiqueta, columna, valor):
+        """Escribe una celda respetando el tipo de la columna"""
+        # La fila puede seguir en el buffer; las eliminadas pendientes no estorban
+        if self.buffer_filas:
+            self.volcar_buffer()
+        df = self._df
+        if columna in self.COLUMNAS_FECHA:
+            valor = fecha_o_texto(valor)
+            if isinstance(valor, str):
+                self.admitir_texto(columna)
+        elif columna in self.COLUMNAS_CATEGORICAS:
+            self.agregar_categorias(columna, [valor])
+        df.loc[etiqueta, columna] = valor
+    
+    def reiniciar_datos(self):
+        self.reiniciar_buffer()
+        self.df = self.aplicar_tipos(pd.DataFrame(columns=self.COLUMNAS))
+        self.reconstruir_indice()
+        self.indices_texto = {}
+        self.indice_fechas = None
+        self.mascaras = {}
+    
+    def cargar_datos(self, parcial=False):
+        """Lee el almacén por bloques y reaplica los cambios que todavía no guardó.
+        
+        Con parcial, las filas leídas se publican en self.df mientras sigue la
+        lectura; se publica cada vez que se duplica lo leído, así el total de
+        copias sigue siendo proporcional al tamaño del libro. Sin parcial el
+        DataFrame se reemplaza una sola vez al final.
+        """
+        leido = []
+        nuevos = []
+        filas = filas_nuevas = 0
+        for bloque in self.almacen.cargar_por_bloques(self.TAMANO_BLOQUE_LECTURA):
+            bloque = self.aplicar_tipos(bloque)
+            bloque.index = pd.RangeIndex(filas, filas + len(bloque))
+            filas += len(bloque)
+            self.filas_leidas = filas
+            nuevos.append(bloque)
+            filas_nuevas += len(bloque)
+            if parcial and filas_nuevas >= filas - filas_nuevas:
+                leido = [self.unir_bloques(leido + nuevos)]
+                nuevos, filas_nuevas = [], 0
+                self.publicar(leido[0])
+        if nuevos or not leido:
+            self.publicar(self.unir_bloques(leido + nuevos) if nuevos
+                          else self.aplicar_tipos(pd.DataFrame(columns=self.COLUMNAS)))
+        with self.cerrojo:
+            self.almacen.terminar_carga(self._df)
+            # Recuperación: reaplicar los cambios que quedaron en el diario o sin escribir
+            for entrada in self.almacen.pendientes():
+                self.aplicar_cambio(entrada['op'], entrada['codigo'], entrada.get('datos'))
+    
+    def cargar_en_segundo_plano(self):
+        try:
+            self.cargar_datos(parcial=True)
+        except Exception as e:
+            # Se avisa desde la interfaz; guardar sobre una carga a medias perdería filas
+            self.error_carga = e
+        finally:
+            self.cargado.set()
+    
+    def unir_bloques(self, bloques):
+        """Concatena bloques ya tipados; las categorías de cada uno pueden diferir y se unen antes"""
+        if len(bloques) == 1:
+            return bloques[0]
+        tipos = {}
+        for columna in self.COLUMNAS_CATEGORICAS:
+            categorias = dict.fromkeys(c for bloque in bloques for c in bloque[columna].cat.categories)
+            tipos[columna] = pd.CategoricalDtype(list(categorias))
+        return pd.concat([bloque.astype(tipos) for bloque in bloques])
+    
+    def publicar(self, df):
+        with self.cerrojo:
+            self.reiniciar_buffer()
+            self.df = df
+            self.reconstruir_indice()
+            self.indices_texto = {}
+            self.indice_fechas = None
+            self.mascaras = {}
+            self.publicaciones += 1
+    
+    def esperar_carga(self):
+        """Los cambios y el guardado esperan a que el libro esté leído entero"""
+        self.cargado.wait()
+        if self.error_carga is not None:
+            raise self.error_carga
+    
+    def reconstruir_indice(self):
+        """Índice clave -> etiqueta de fila para no recorrer el DataFrame en cada búsqueda"""
+        self.indice = dict(zip(self.df[self.CLAVE], self.df.index))
+        self.siguiente_etiqueta = int(self.df.index.max()) + 1 if len(self.df) else 0
+    
+    def aplicar_cambio(self, operacion, codigo, datos=None):
+        """Aplica un cambio sobre el DataFrame; es idempotente para poder reaplicar lo pendiente"""
+        with self.cerrojo:
+            # Cualquier cambio mueve posiciones o valores: las máscaras ya no sirven
+            self.mascaras = {}
+            etiqueta = self.indice.get(codigo)
+            if operacion == 'agregar':
+                if etiqueta is None:
+                    # Las etiquetas nunca se reutilizan, así el índice sigue siendo válido tras eliminar
+                    etiqueta = self.siguiente_etiqueta
+                    self.siguiente_etiqueta += 1
+                    self.agregar_al_buffer(etiqueta, datos)
+                    self.indice[codigo] = etiqueta
+                else:
+                    self.desindexar_fecha(etiqueta, datos)
+                    for columna, valor in datos.items():
+                        self.asignar(etiqueta, columna, valor)
+                self.indexar_texto(etiqueta, datos)
+                self.indexar_fecha(etiqueta, datos)
+            elif operacion == 'actualizar':
+                if etiqueta is not None:
+                    self.desindexar_fecha(etiqueta, datos)
+                    for columna, valor in datos.items():
+                        self.asignar(etiqueta, columna, valor)
+                    self.indexar_texto(etiqueta, datos)
+                    self.indexar_fecha(etiqueta, datos)
+            elif operacion == 'eliminar':
+                if etiqueta is not None:
+                    self.desindexar_fecha(etiqueta)
+                    # Se marca y se quita con las demás en la próxima lectura: drop copia todo el DataFrame
+                    self.eliminadas.append(etiqueta)
+                    del self.indice[codigo]
+                    for indice in self.indices_texto.values():
+                        indice.quitar(etiqueta)
+            return etiqueta
+    
+    def indexar_texto(self, etiqueta, datos):
+        for columna, indice in self.indices_texto.items():
+            if columna in datos:
+                indice.agregar(etiqueta, datos[columna])
+    
+    def desindexar_fecha(self, etiqueta, datos=None):
+        # Se llama antes de escribir: la fecha anterior se lee del DataFrame
+        columna = self.COLUMNA_FECHA_INDEXADA
+        if self.indice_fechas is not None and (datos is None or columna in datos):
+            try:
+                fecha = self._df.at[etiqueta, columna]
+            except KeyError:
+                # Sigue en el buffer
+                fecha = self.df.at[etiqueta, columna]
+            self.indice_fechas.quitar(etiqueta, parsear_fecha(fecha))
+    
+    def indexar_fecha(self, etiqueta, datos):
+        columna = self.COLUMNA_FECHA_INDEXADA
+        if self.indice_fechas is not None and columna in datos:
+            self.indice_fechas.agregar(etiqueta, parsear_fecha(datos[columna]))
+    
+    def fechas_indexadas(self):
+        """Índice ordenado de COLUMNA_FECHA_INDEXADA; se arma en la primera consulta"""
+        if self.indice_fechas is None:
+            df = self.df
+            # Los textos que no son fechas quedan fuera del índice
+            self.indice_fechas = IndiceFechas(df.index, parsear_fechas(df[self.COLUMNA_FECHA_INDEXADA]))
+        return self.indice_fechas
+    
+    def buscar_texto(self, consulta, columna=None):
+        """Etiquetas de las filas cuya columna contiene la consulta, sin distinguir mayúsculas"""
+        if columna is None:
+            columna = self.COLUMNAS_TEXTO[0]
+        indice = self.indices_texto.get(columna)
+        if indice is None:
+            df = self.df
+            indice = IndiceTexto()
+            indice.construir(df.index, df[columna])
+            self.indices_texto[columna] = indice
+        return indice.buscar(consulta)
+    
+    def mascara(self, columna, valor):
+        """Máscara booleana de las filas que cumplen un filtro; queda guardada para las siguientes búsquedas"""
+        clave = (columna, valor)
+        # Sacar y volver a poner deja las más usadas al final del diccionario
+        mascara = self.mascaras.pop(clave, None)
+        if mascara is None:
+            df = self.df
+            if columna in self.COLUMNAS_TEXTO:
+                mascara = np.zeros(len(df), dtype=bool)
+                mascara[df.index.get_indexer(list(self.buscar_texto(valor, columna)))] = True
+            else:
+                mascara = (df[columna] == valor).to_numpy()
+            if len(self.mascaras) >= self.MAXIMO_MASCARAS:
+                del self.mascaras[next(iter(self.mascaras))]
+        self.mascaras[clave] = mascara
+        return mascara
+    
+    def filtrar(self, cancelado=None, **filtros):
+        """Combina los filtros de la vista, uno por argumento de COLUMNAS_FILTRO; los vacíos no filtran.
+        
+        Cada filtro es una máscara en caché, así al cambiar uno solo se calcula ese.
+        cancelado() se consulta entre pasos: si devuelve True se abandona y se devuelve None.
+        """
+        desconocidos = set(filtros) - set(self.COLUMNAS_FILTRO)
+        if desconocidos:
+            raise TypeError(f"Filtros desconocidos: {', '.join(sorted(desconocidos))}")
+        with self.cerrojo:
+            df = self.df
+            mascara = None
+            for nombre, columna in self.COLUMNAS_FILTRO.items():
+                valor = filtros.get(nombre)
+                if not valor:
+                    continue
+                if cancelado is not None and cancelado():
+                    return None
+                parcial = self.mascara(columna, valor)
+                mascara = parcial if mascara is None else mascara & parcial
+            return df if mascara is None else df[mascara]
+    
+    def registrar_cambio(self, operacion, codigo, datos=None):
+        self.esperar_carga()
+        # Aplicar y registrar juntos: una recarga en el medio perdería el cambio de la vista
+        with self.cerrojo:
+            inverso = self.inverso(operacion, codigo, datos)
+            etiqueta = self.aplicar_cambio(operacion, codigo, datos)
+            self.almacen.registrar(self, operacion, codigo, datos)
+            if inverso is not None:
+                self.historial.anotar([(operacion, codigo, datos)], [inverso])
+        self.notificar([(operacion, codigo, etiqueta)])
+    
+    def valores_filas(self, etiquetas, columnas):
+        """Valores de las filas tal como los recibe asignar (fechas en texto, vacíos como None)"""
+        df = self.df.loc[etiquetas, columnas]
+        valores = {}
+        for columna in columnas:
+            if columna in self.COLUMNAS_FECHA:
+                valores[columna] = df[columna].map(formatear_fecha)
+            else:
+                valores[columna] = df[columna].astype(object).where(df[columna].notna(), None)
+        return pd.DataFrame(valores, index=df.index).to_dict('records')
+    
+    def inverso(self, operacion, codigo, datos=None):
+        """Operación que deshace (operacion, codigo, datos); se calcula antes de aplicarla"""
+        etiqueta = self.indice.get(codigo)
+        if etiqueta is None:
+            # Actualizar o eliminar un código que no existe no cambia nada
+            return ('eliminar', codigo, None) if operacion == 'agregar' else None
+        if operacion == 'eliminar':
+            return ('agregar', codigo, self.valores_filas([etiqueta], self.COLUMNAS)[0])
+        return ('actualizar', codigo, self.valores_filas([etiqueta], list(datos))[0])
+    
+    def aplicar_operaciones(self, operaciones):
+        """Aplica y guarda una lista de cambios como un solo lote, sin anotarla en el historial"""
+        with self.cerrojo:
+            if len(operaciones) > 1:
+                self.indice_fechas = None
+            eventos = [(operacion, codigo, self.aplicar_cambio(operacion, codigo, datos))
+                       for operacion, codigo, datos in operaciones]
+            self.almacen.registrar_lote(self, operaciones)
+        # Un código que ya no existe no tiene fila que mostrar
+        eventos = [evento for evento in eventos if evento[2] is not None]
+        if eventos:
+            self.notificar(eventos)
+    
+    def deshacer(self):
+        """Revierte el último cambio o lote; False si no había nada que deshacer"""
+        self.esperar_carga()
+        with self.cerrojo:
+            operaciones = self.historial.sacar_para_deshacer()
+            if operaciones is None:
+                return False
+            self.aplicar_operaciones(operaciones)
+        return True
+    
+    def rehacer(self):
+        """Vuelve a aplicar lo último que se deshizo; False si no había nada"""
+        self.esperar_carga()
+        with self.cerrojo:
+            operaciones = self.historial.sacar_para_rehacer()
+            if operaciones is None:
+                return False
+            self.aplicar_operaciones(operaciones)
+        return True
+    
+    def recargar(self):
+        """Vuelve a leer el libro que guardó otro proceso y reaplica los cambios propios pendientes"""
+        with self.cerrojo:
+            self.cargar_datos()
+            self.recargado = True
+    
+    def revisar_cambios_externos(self):
+        """Pide recargar si otro proceso guardó el libro; True si hubo una recarga desde la última consulta"""
+        if not self.cargado.is_set():
+            return False
+        self.almacen.revisar(self)
+        recargado, self.recargado = self.recargado, False
+        return recargado
+    
+    def suscribir(self, funcion):
+        """funcion recibe una lista de (operacion, codigo, etiqueta) tras cada cambio"""
+        self.observadores.append(funcion)
+    
+    def notificar(self, cambios):
+        for funcion in self.observadores:
+            funcion(cambios)
+    
+    def generar_codigo(self):
+        while True:
+            codigo = self.asignador.siguiente_codigo()
+            # Los registros anteriores tienen códigos al azar que podrían coincidir
+            if codigo not in self.indice:
+                return codigo
+    
+    def agregar_registros(self, registros):
+        """Agrega muchos registros de una vez; cada uno es un dict con las columnas del libro"""
+        registros = list(registros)
+        self.esperar_carga()
+        self.asignador.preparar(len(registros))
+        cambios = []
+        eventos = []
+        with self.cerrojo:
+            # Insertar fila por fila en el índice de fechas costaría más que volver a armarlo
+            self.indice_fechas = None
+            for registro in registros:
+                codigo = self.generar_codigo()
+                nuevo_registro = {columna: registro.get(columna, '') for columna in self.COLUMNAS}
+                nuevo_registro[self.CLAVE] = codigo
+                etiqueta = self.aplicar_cambio('agregar', codigo, nuevo_registro)
+                cambios.append(('agregar', codigo, nuevo_registro))
+                eventos.append(('agregar', codigo, etiqueta))
+            if cambios:
+                self.almacen.registrar_lote(self, cambios)
+                self.historial.anotar(cambios, [('eliminar', codigo, None) for _, codigo, _ in cambios])
+        
+        if cambios:
+            self.notificar(eventos)
+        return [codigo for _, codigo, _ in cambios]
+    
+    def editar(self, codigo, cambios):
+        self.esperar_carga()
+        if codigo not in self.indice:
+            return False
+        
+        self.registrar_cambio('actualizar', codigo, cambios)
+        return True
+    
+    def editar_lote(self, codigos, cambios):
+        """Aplica los mismos cambios a varios registros con una sola entrada en el almacén.
+        
+        Devuelve los códigos que existían y se editaron.
+        """
+        self.esperar_carga()
+        with self.cerrojo:
+            editados = [codigo for codigo in dict.fromkeys(codigos) if codigo in self.indice]
+            if editados:
+                self.mascaras = {}
+                if self.COLUMNA_FECHA_INDEXADA in cambios:
+                    self.indice_fechas = None
+                etiquetas = [self.indice[codigo] for codigo in editados]
+                anteriores = self.valores_filas(etiquetas, list(cambios))
+                # Una asignación por columna para todas las filas
+                for columna, valor in cambios.items():
+                    self.asignar(etiquetas, columna, valor)
+                for etiqueta in etiquetas:
+                    self.indexar_texto(etiqueta, cambios)
+                lote = [('actualizar', codigo, cambios) for codigo in editados]
+                self.almacen.registrar_lote(self, lote)
+                self.historial.anotar(lote, [('actualizar', codigo, valores)
+                                             for codigo, valores in zip(editados, anteriores)])
+        
+        if editados:
+            self.notificar([('actualizar', codigo, self.indice[codigo]) for codigo in editados])
+        return editados
+    
+    def eliminar(self, codigo):
+        self.esperar_carga()
+        if codigo not in self.indice:
+            return False
+        
+        self.registrar_cambio('eliminar', codigo)
+        return True
+    
+    def buscar(self, codigo):
+        etiqueta = self.indice.get(codigo)
+        if etiqueta is None:
+            return None
+        return self.df.loc[[etiqueta]]
+    
+    def obtener_todos(self):
+        return self.df
+    
+    def guardar(self):
+        """Materializa el registro completo en el libro de Excel"""
+        self.esperar_carga()
+        self.almacen.guardar(self)
+    
+    def exportar_excel(self, ruta=None):
+        """Escribe el registro completo en un libro de Excel"""
+        if ruta is None:
+            self.guardar()
+            return self.archivo
+        self.esperar_carga()
+        AlmacenExcel(ruta).escribir(self.df)
+        return ruta
+    
+    def errores_guardado(self):
+        """Errores de las escrituras en segundo plano desde la última consulta"""
+        return self.almacen.errores_pendientes()
+    
+    def cerrar(self):
+        self.esperar_carga()
+        self.almacen.cerrar(self)
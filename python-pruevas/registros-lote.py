@@ -0,0 +1,186 @@
+"""Trabajos por lotes sobre los registros, sin abrir la interfaz.
+
+Todo el lote se aplica en memoria y se guarda una sola vez al final, así
+sirve para tareas nocturnas en una máquina sin pantalla.
+
+Ejemplos:
+  python registros-lote.py importar nuevos.csv
+  python registros-lote.py exportar entregados.jsonl --donde "Estado == 'Entregado'"
+  python registros-lote.py estado Calificado --donde "Estado == 'Revisado' and Materia == 'Arte'"
+  python registros-lote.py calificar Bueno --codigos ABC12345,XYZ98765
+  python registros-lote.py --registro articulos estado Devuelto --codigos-desde codigos.txt
+
+En --donde las columnas con espacios van entre comillas invertidas: `Fecha Entrega`.
+"""
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+from registro_base import FORMATO_FECHA, cargar_modulo, formatear_fecha
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+
+# Registro -> (script que lo define, clase)
+REGISTROS = {
+    'trabajos': ('administrador-trabajos.py', 'RegistroTrabajos'),
+    'articulos': ('e-in.py', 'RegistroArticulos'),
+    'documentos': ('e-admin-doc.py', 'RegistroArticulos'),
+}
+
+
+def abrir_registro(argumentos):
+    modulo = cargar_modulo(REGISTROS[argumentos.registro][0])
+    if argumentos.sqlite:
+        if argumentos.registro != 'trabajos':
+            raise ValueError("--sqlite solo existe para el registro de trabajos")
+        clase = modulo.RegistroTrabajosSQLite
+    else:
+        clase = getattr(modulo, REGISTROS[argumentos.registro][1])
+    registro = clase(argumentos.archivo) if argumentos.archivo else clase()
+    return modulo, registro
+
+
+def leer_filas(ruta):
+    """Filas de un CSV o JSONL como dicts de texto"""
+    if ruta.endswith('.jsonl'):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return [json.loads(linea) for linea in f if linea.strip()]
+    df = pd.read_csv(ruta, dtype=str, keep_default_na=False)
+    return df.to_dict('records')
+
+
+def escribir_filas(df, ruta, formato_fecha):
+    df = df.copy()
+    for columna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[columna]):
+            df[columna] = df[columna].dt.strftime(formato_fecha).fillna('')
+        elif pd.api.types.infer_dtype(df[columna], skipna=True) in ('datetime', 'mixed'):
+            # Fechas que conservan textos viejos que no son fechas
+            df[columna] = df[columna].map(formatear_fecha)
+    if ruta.endswith('.jsonl'):
+        df.to_json(ruta, orient='records', lines=True, force_ascii=False)
+    else:
+        df.to_csv(ruta, index=False)
+
+
+def seleccionar(registro, argumentos, obligatorio=True):
+    """DataFrame con las filas elegidas por --codigos, --codigos-desde o --donde"""
+    df = registro.obtener_todos()
+    if argumentos.codigos or argumentos.codigos_desde:
+        codigos = []
+        if argumentos.codigos:
+            codigos += argumentos.codigos.split(',')
+        if argumentos.codigos_desde:
+            with open(argumentos.codigos_desde, 'r', encoding='utf-8') as f:
+                codigos += f.read().split()
+        codigos = {codigo.strip().upper() for codigo in codigos if codigo.strip()}
+        df = df[df['Codigo'].isin(codigos)]
+    elif argumentos.donde:
+        try:
+            df = df.query(argumentos.donde)
+        except Exception as e:
+            # Errores de sintaxis, de tokenización, columnas inexistentes o tipos que no se comparan
+            raise ValueError(f"La condición --donde {argumentos.donde!r} no es válida: {e}") from e
+    elif obligatorio:
+        raise ValueError("Indica los registros con --codigos, --codigos-desde o --donde")
+    return df
+
+
+def validar_columnas(filas, columnas):
+    """Rechaza la entrada si alguna fila trae columnas que el registro no tiene o le falta alguna"""
+    # El código lo asigna el registro; uno que venga en el archivo se ignora
+    esperadas = set(columnas) - {'Codigo'}
+    for numero, fila in enumerate(filas, 1):
+        if not isinstance(fila, dict):
+            raise ValueError(f"Fila {numero}: se esperaba un objeto con las columnas del registro")
+        presentes = set(fila) - {'Codigo'}
+        problemas = []
+        if presentes - esperadas:
+            problemas.append("columnas desconocidas: " + ', '.join(sorted(presentes - esperadas)))
+        if esperadas - presentes:
+            problemas.append("faltan columnas: " + ', '.join(sorted(esperadas - presentes)))
+        if problemas:
+            raise ValueError(f"Fila {numero}: {'; '.join(problemas)}")
+
+
+def importar(modulo, registro, argumentos):
+    filas = leer_filas(argumentos.entrada)
+    validar_columnas(filas, registro.COLUMNAS)
+    codigos = registro.agregar_registros(filas)
+    print(f"Importados {len(codigos)} registros de {argumentos.entrada}")
+
+
+def exportar(modulo, registro, argumentos):
+    df = seleccionar(registro, argumentos, obligatorio=False)
+    escribir_filas(df, argumentos.salida, FORMATO_FECHA)
+    print(f"Exportados {len(df)} registros a {argumentos.salida}")
+
+
+def cambiar_columna(columna):
+    def comando(modulo, registro, argumentos):
+        df = seleccionar(registro, argumentos)
+        editados = registro.editar_lote(df['Codigo'].tolist(), {columna: argumentos.valor})
+        print(f"{columna} = {argumentos.valor!r} en {len(editados)} registros")
+    return comando
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        description="Importa, exporta y actualiza los registros por lotes sin abrir la interfaz.",
+        epilog="En --donde las columnas con espacios van entre comillas invertidas: `Fecha Entrega`."
+    )
+    parser.add_argument('--registro', choices=sorted(REGISTROS), default='trabajos')
+    parser.add_argument('--archivo', help="libro o base del registro (por defecto el de la aplicación)")
+    parser.add_argument('--sqlite', action='store_true', help="usar la base SQLite de trabajos")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    def agregar_seleccion(subparser):
+        subparser.add_argument('--codigos', help="códigos separados por comas")
+        subparser.add_argument('--codigos-desde', help="archivo con un código por línea")
+        subparser.add_argument('--donde', help="condición de pandas, p.ej. \"Estado == 'Entregado'\"")
+
+    importar_parser = comandos.add_parser('importar', help="agrega las filas de un CSV o JSONL")
+    importar_parser.add_argument('entrada')
+    importar_parser.set_defaults(funcion=importar)
+
+    exportar_parser = comandos.add_parser('exportar', help="escribe el registro (o una selección) a CSV o JSONL")
+    exportar_parser.add_argument('salida')
+    agregar_seleccion(exportar_parser)
+    exportar_parser.set_defaults(funcion=exportar)
+
+    estado_parser = comandos.add_parser('estado', help="cambia el Estado de los registros elegidos")
+    estado_parser.add_argument('valor')
+    agregar_seleccion(estado_parser)
+    estado_parser.set_defaults(funcion=cambiar_columna('Estado'))
+
+    calificar_parser = comandos.add_parser('calificar', help="cambia la Calificacion de los trabajos elegidos")
+    calificar_parser.add_argument('valor')
+    agregar_seleccion(calificar_parser)
+    calificar_parser.set_defaults(funcion=cambiar_columna('Calificacion'))
+    return parser
+
+
+def main(argv=None):
+    argumentos = crear_parser().parse_args(argv)
+    if argumentos.comando == 'calificar' and argumentos.registro != 'trabajos':
+        print("Error: solo los trabajos tienen calificación", file=sys.stderr)
+        return 1
+    registro = None
+    try:
+        modulo, registro = abrir_registro(argumentos)
+        argumentos.funcion(modulo, registro, argumentos)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if registro is not None:
+            # Aquí se hace el único guardado del lote
+            registro.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
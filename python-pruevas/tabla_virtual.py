@@ -0,0 +1,258 @@
+"""Tabla virtual para los Treeview de las aplicaciones de registros."""
+import queue
+
+from registro_base import TrabajadorSegundoPlano, importar_diferido
+
+pd = importar_diferido('pandas')
+
+class TablaVirtual:
+    """Treeview que solo crea los ítems de las filas visibles más un margen arriba y abajo.
+    
+    La barra de desplazamiento representa el DataFrame completo; al moverse se
+    vuelve a llenar la ventana de filas en lugar de tener todas insertadas.
+    """
+    MARGEN = 20
+    ALTO_FILA = 20
+    
+    def __init__(self, tree, scroll_y, convertir_filas, columna_clave='Codigo'):
+        self.tree = tree
+        self.scroll_y = scroll_y
+        # convertir_filas(df) devuelve (valores, tag) por cada fila de df
+        self.convertir_filas = convertir_filas
+        self.columna_clave = columna_clave
+        self.df = None
+        self.inicio = 0
+        self.visibles = 25
+        self.ventana = (0, 0)
+        
+        self.scroll_y.config(command=self.desplazar)
+        self.tree.configure(yscrollcommand=self.al_desplazar_arbol)
+        self.tree.bind('<Configure>', self.redimensionar, add='+')
+    
+    def mostrar(self, df, conservar_posicion=False):
+        self.df = df
+        if not conservar_posicion:
+            self.inicio = 0
+        self.renderizar()
+    
+    def total(self):
+        return 0 if self.df is None else len(self.df)
+    
+    def redimensionar(self, event=None):
+        visibles = max(1, self.tree.winfo_height() // self.ALTO_FILA)
+        if visibles != self.visibles:
+            self.visibles = visibles
+            self.renderizar()
+    
+    def renderizar(self):
+        total = self.total()
+        self.inicio = max(0, min(self.inicio, total - self.visibles))
+        desde = max(0, self.inicio - self.MARGEN)
+        hasta = min(total, self.inicio + self.visibles + self.MARGEN)
+        
+        seleccion = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        if total:
+            self.insertar(self.df.iloc[desde:hasta])
+        self.ventana = (desde, hasta)
+        
+        # Conservar la selección si la fila sigue dentro de la ventana
+        seleccion = [iid for iid in seleccion if self.tree.exists(iid)]
+        if seleccion:
+            self.tree.selection_set(seleccion)
+        if hasta > desde:
+            self.tree.yview_moveto((self.inicio - desde) / (hasta - desde))
+        self.actualizar_barra()
+    
+    def posicion(self, codigo, etiqueta=None):
+        """Posición en la vista de la fila con codigo, o None si la vista no la tiene.
+        
+        La etiqueta es solo una pista: si el registro se recargó después de llenar
+        la vista, la misma etiqueta puede ser otra fila.
+        """
+        if self.df is None:
+            return None
+        if etiqueta is not None and etiqueta in self.df.index:
+            posicion = self.df.index.get_loc(etiqueta)
+            if isinstance(posicion, int) and self.df[self.columna_clave].iat[posicion] == codigo:
+                return posicion
+        posiciones = (self.df[self.columna_clave] == codigo).to_numpy().nonzero()[0]
+        return int(posiciones[0]) if len(posiciones) else None
+    
+    def item(self, posicion):
+        """Ítem del árbol que muestra la fila en posicion, o None si está fuera de la ventana"""
+        desde, hasta = self.ventana
+        if not desde <= posicion < hasta:
+            return None
+        return self.tree.get_children()[posicion - desde]
+    
+    def actualizar_fila(self, codigo, fila, compartida=False):
+        """Refresca una sola fila editada sin volver a dibujar la tabla.
+        
+        fila es el DataFrame de una fila que devuelve buscar. Con compartida la vista
+        es el propio DataFrame del registro, que ya tiene el cambio y que el hilo de
+        los filtros puede estar leyendo: entonces no se escribe en ella.
+        """
+        posicion = self.posicion(codigo, fila.index[0])
+        if posicion is None:
+            return
+        if not compartida:
+            etiqueta = self.df.index[posicion]
+            # La vista puede ser una copia filtrada con menos categorías que el registro
+            for columna, valor in fila.iloc[0].items():
+                serie = self.df[columna]
+                if (isinstance(serie.dtype, pd.CategoricalDtype) and not pd.isna(valor)
+                        and valor not in serie.cat.categories):
+                    self.df[columna] = serie.cat.add_categories([valor])
+                elif pd.api.types.is_datetime64_any_dtype(serie) and isinstance(valor, str):
+                    # La fecha quedó como texto en el registro (ver fechas_o_texto)
+                    self.df[columna] = serie.astype(object)
+            self.df.loc[etiqueta, fila.columns] = fila.iloc[0].values
+        item = self.item(posicion)
+        if item is not None:
+            # El ítem se dibuja con la fila del registro, esté o no escrita en la vista
+            for valores, tag in self.convertir_filas(fila):
+                self.tree.item(item, values=valores, tags=(tag,))
+    
+    def quitar_fila(self, codigo, etiqueta, df=None):
+        """Quita una fila; df es la vista ya sin esa fila si el llamador la tiene"""
+        posicion = self.posicion(codigo, etiqueta)
+        if posicion is None:
+            return
+        item = self.item(posicion)
+        self.df = df if df is not None else self.df.drop(self.df.index[posicion])
+        
+        desde, hasta = self.ventana
+        if posicion < desde:
+            desde -= 1
+            hasta -= 1
+            self.inicio -= 1
+        elif posicion < hasta:
+            self.tree.delete(item)
+            hasta -= 1
+            # Completar la ventana con la fila que sigue
+            if hasta < len(self.df):
+                self.insertar(self.df.iloc[hasta:hasta + 1])
+                hasta += 1
+        self.ventana = (desde, hasta)
+        self.actualizar_barra()
+    
+    def agregar_fila(self, df=None, nuevas=None):
+        """La vista pasa a ser df, que tiene una fila nueva al final; sin df se agregan las filas nuevas"""
+        if df is None:
+            df = pd.concat([self.df, nuevas])
+        self.df = df
+        desde, hasta = self.ventana
+        if hasta == len(df) - 1 and hasta < self.inicio + self.visibles + self.MARGEN:
+            self.insertar(df.iloc[hasta:hasta + 1])
+            hasta += 1
+        self.ventana = (desde, hasta)
+        self.actualizar_barra()
+    
+    def insertar(self, df):
+        """Agrega al final del árbol las filas de df, convertidas en un solo paso"""
+        for valores, tag in self.convertir_filas(df):
+            # El código como iid conserva la selección; uno vacío o repetido usa el iid que da Tk
+            codigo = valores[0]
+            iid = codigo if codigo and not self.tree.exists(codigo) else None
+            self.tree.insert('', 'end', iid=iid, values=valores, tags=(tag,))
+    
+    def actualizar_barra(self):
+        total = self.total()
+        if total <= self.visibles:
+            self.scroll_y.set(0, 1)
+        else:
+            self.scroll_y.set(self.inicio / total, min(1, (self.inicio + self.visibles) / total))
+    
+    def desplazar(self, accion, cantidad, unidad=None):
+        """Comando de la barra vertical: 'moveto' o 'scroll' sobre el DataFrame completo"""
+        if accion == 'moveto':
+            self.inicio = int(float(cantidad) * self.total())
+        elif unidad == 'pages':
+            self.inicio += int(cantidad) * self.visibles
+        else:
+            self.inicio += int(cantidad)
+        self.renderizar()
+    
+    def al_desplazar_arbol(self, *args):
+        # El Treeview se desplazó por sí mismo (rueda, teclado) dentro del margen
+        desde, hasta = self.ventana
+        if hasta == desde:
+            return
+        fila = desde + round(self.tree.yview()[0] * (hasta - desde))
+        if fila == self.inicio:
+            return
+        
+        self.inicio = fila
+        cerca_arriba = desde > 0 and fila - desde < self.MARGEN // 2
+        cerca_abajo = hasta < self.total() and hasta - (fila + self.visibles) < self.MARGEN // 2
+        if cerca_arriba or cerca_abajo:
+            self.renderizar()
+        else:
+            self.actualizar_barra()
+
+class FiltroSegundoPlano:
+    """Corre las búsquedas de la barra de filtros en otro hilo.
+    
+    Cada búsqueda deja obsoleta a la anterior: si no empezó se descarta y si está
+    en curso se abandona en el siguiente paso. Las teclas esperan una pausa antes
+    de filtrar. El resultado y los errores se recogen desde Tk con after, nunca
+    desde el hilo, y se entregan a al_terminar y al_fallar.
+    """
+    ESPERA_TECLAS = 150  # ms sin escribir antes de filtrar
+    INTERVALO_RESULTADOS = 30
+    
+    def __init__(self, root, sistema, leer_filtros, al_terminar, al_fallar):
+        self.root = root
+        self.sistema = sistema
+        self.leer_filtros = leer_filtros
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.hilo = TrabajadorSegundoPlano()
+        self.resultados = queue.Queue()
+        self.generacion = 0
+        self.espera = None
+        self.revisando = False
+    
+    def programar(self):
+        """Filtra cuando se deja de escribir"""
+        if self.espera is not None:
+            self.root.after_cancel(self.espera)
+        self.espera = self.root.after(self.ESPERA_TECLAS, self.aplicar)
+    
+    def aplicar(self):
+        self.cancelar()
+        generacion = self.generacion
+        self.hilo.solicitar(self.calcular, generacion, self.leer_filtros())
+        if not self.revisando:
+            self.revisando = True
+            self.root.after(self.INTERVALO_RESULTADOS, self.revisar)
+    
+    def cancelar(self):
+        """Deja obsoleta cualquier búsqueda pendiente o en curso"""
+        if self.espera is not None:
+            self.root.after_cancel(self.espera)
+            self.espera = None
+        self.generacion += 1
+    
+    def en_curso(self):
+        return self.hilo.ocupado() or not self.resultados.empty()
+    
+    def calcular(self, generacion, filtros):
+        # Corre en el hilo de trabajo
+        cancelado = lambda: generacion != self.generacion
+        resultado = self.sistema.filtrar(cancelado=cancelado, **filtros)
+        if resultado is not None and not cancelado():
+            self.resultados.put((generacion, resultado))
+    
+    def revisar(self):
+        while not self.resultados.empty():
+            generacion, resultado = self.resultados.get()
+            if generacion == self.generacion:
+                self.al_terminar(resultado)
+        for error in self.hilo.errores_pendientes():
+            self.al_fallar(error)
+        if self.en_curso():
+            self.root.after(self.INTERVALO_RESULTADOS, self.revisar)
+        else:
+            self.revisando = False
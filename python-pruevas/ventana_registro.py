@@ -0,0 +1,280 @@
+"""Ciclo de vida común de las ventanas de las aplicaciones de registros."""
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from registro_base import columna_a_texto, buscar_tags, precargar
+from tabla_virtual import TablaVirtual, FiltroSegundoPlano
+
+class VentanaRegistro:
+    """Ventana principal de un registro, sin la interfaz propia de cada aplicación.
+    
+    La ventana aparece enseguida con un aviso mientras pandas y tkcalendar se
+    importan en otro hilo; después se crea el registro, que lee el libro en
+    segundo plano, y la interfaz. Las subclases definen crear_registro y
+    crear_interfaz, que arma la tabla con crear_tabla, la barra de filtros con
+    crear_filtro_combo y crear_filtro_texto, self.entry_buscar y self.label_carga.
+    """
+    TITULO = ''
+    TAMANO = '1000x650'
+    # Columnas del registro en el orden en que las muestra la tabla
+    COLUMNAS_TABLA = []
+    # Color de las filas: valor de COLUMNA_TAGS -> tag del Treeview; los demás usan TAG_POR_DEFECTO
+    COLUMNA_TAGS = None
+    TAGS = {}
+    TAG_POR_DEFECTO = ''
+    
+    def __init__(self, root, sistema=None):
+        """Con sistema se usa ese registro en lugar de crear uno con crear_registro"""
+        self.root = root
+        self.root.title(self.TITULO)
+        self.root.geometry(self.TAMANO)
+        self.configurar_estilos()
+        self.sistema = sistema
+        self.label_inicio = ttk.Label(self.root, text="Cargando...", font=('Arial', 12))
+        self.label_inicio.pack(expand=True)
+        self.modulos_listos = threading.Event()
+        threading.Thread(target=self.importar_modulos, daemon=True).start()
+        self.esperar_modulos()
+    
+    def configurar_estilos(self):
+        # Estilos personalizados (paleta azul oscura, profesional)
+        self.style = ttk.Style()
+        try:
+            self.style.theme_use('clam')
+        except Exception:
+            pass
+        
+        # LabelFrame oscuro
+        self.style.configure('Blue.TLabelframe', background='#0b3d91')
+        self.style.configure('Blue.TLabelframe.Label', background='#0b3d91', foreground='#ffffff', font=('Arial', 11, 'bold'))
+        
+        # Labels dentro de los frames
+        self.style.configure('Blue.TLabel', background='#0b3d91', foreground='#ffffff', font=('Arial', 10))
+        
+        # Botones con azul más oscuro
+        self.style.configure('Blue.TButton', background='#0b57d0', foreground='#ffffff', font=('Arial', 10, 'bold'))
+        self.style.map('Blue.TButton', background=[('active', '#0844a8')], foreground=[('active', '#ffffff')])
+        
+        # Treeview encabezados
+        self.style.configure('Treeview.Heading', background='#0b57d0', foreground='#ffffff', font=('Arial', 10, 'bold'))
+        self.style.configure('Treeview', background='#ffffff', foreground='#000000', fieldbackground='#ffffff')
+    
+    def importar_modulos(self):
+        try:
+            precargar('pandas', 'numpy', 'openpyxl', 'tkcalendar')
+        finally:
+            # Si algo falla, el error aparece al usar el módulo desde la interfaz
+            self.modulos_listos.set()
+    
+    def crear_registro(self):
+        raise NotImplementedError
+    
+    def esperar_modulos(self):
+        if not self.modulos_listos.is_set():
+            self.root.after(50, self.esperar_modulos)
+            return
+        self.label_inicio.destroy()
+        if self.sistema is None:
+            try:
+                # El libro se lee en otro hilo: la tabla se va llenando con las primeras filas
+                self.sistema = self.crear_registro()
+            except PermissionError as e:
+                messagebox.showerror("Error de Acceso", str(e))
+                self.root.destroy()
+                return
+        
+        # Los filtros de la barra se registran al crear la interfaz
+        self.filtros_vista = {}
+        self.filtro = FiltroSegundoPlano(self.root, self.sistema, self.leer_filtros,
+                                         self.mostrar_filtrado, self.mostrar_error_filtro)
+        self.crear_interfaz()
+        self.actualizar_tabla()
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self.publicaciones_vistas = 0
+        self.revisar_carga()
+        self.revisar_errores_guardado()
+    
+    def revisar_carga(self):
+        """Mientras se lee el libro, la tabla se va llenando con las filas ya leídas"""
+        if self.sistema.cargado.is_set():
+            self.label_carga.config(text='')
+            if self.sistema.error_carga is not None:
+                # Sin cerrar el registro: guardar ahora dejaría el libro a medias
+                messagebox.showerror("Error de Acceso", str(self.sistema.error_carga))
+                self.root.destroy()
+                return
+            # Lo último leído y los cambios del diario reaplicados
+            self.refrescar_vista()
+            return
+        if self.sistema.publicaciones != self.publicaciones_vistas:
+            self.publicaciones_vistas = self.sistema.publicaciones
+            self.refrescar_vista()
+        self.label_carga.config(text=f"Cargando... {self.sistema.filas_leidas:,} filas")
+        self.root.after(100, self.revisar_carga)
+    
+    def revisar_errores_guardado(self):
+        # Las escrituras van en otro hilo; sus errores se muestran desde aquí
+        for error in self.sistema.errores_guardado():
+            messagebox.showerror("Error de Acceso", str(error))
+        # Otros usuarios pueden estar guardando el mismo registro
+        if self.sistema.revisar_cambios_externos():
+            self.al_recargar()
+        self.root.after(500, self.revisar_errores_guardado)
+    
+    def al_recargar(self):
+        """Otro proceso guardó el registro y ya se recargó"""
+        self.refrescar_vista()
+    
+    def refrescar_vista(self):
+        """Vuelve a llenar la tabla tras una recarga, sin mover el desplazamiento"""
+        if self.mostrando_todo:
+            self.tabla.mostrar(self.sistema.obtener_todos(), conservar_posicion=True)
+        else:
+            self.filtro.aplicar()
+    
+    def crear_tabla(self, tree, scroll_y):
+        """Tabla virtual sobre tree, al día con cada cambio del registro"""
+        self.tree = tree
+        # La barra vertical la maneja la tabla virtual
+        self.tabla = TablaVirtual(tree, scroll_y, self.convertir_filas)
+        self.mostrando_todo = True
+        self.sistema.suscribir(self.al_cambiar_registro)
+    
+    def crear_filtro_combo(self, padre, nombre, texto, valores, todos='Todos'):
+        """Combo de la barra de filtros para el argumento nombre de filtrar; todos no filtra"""
+        ttk.Label(padre, text=texto).pack(side='left', padx=5)
+        combo = ttk.Combobox(padre, values=[todos] + list(valores), width=12, state='readonly')
+        combo.set(todos)
+        combo.pack(side='left', padx=5)
+        combo.bind('<<ComboboxSelected>>', lambda e: self.aplicar_filtros())
+        self.filtros_vista[nombre] = (combo, todos)
+        return combo
+    
+    def crear_filtro_texto(self, padre, nombre, texto):
+        """Entrada de la barra de filtros para el argumento nombre de filtrar"""
+        ttk.Label(padre, text=texto).pack(side='left', padx=5)
+        entrada = ttk.Entry(padre, width=12)
+        entrada.pack(side='left', padx=5)
+        # Filtrar mientras se escribe: espera una pausa y corre fuera del hilo de Tk
+        entrada.bind('<KeyRelease>', lambda e: self.filtro.programar())
+        self.filtros_vista[nombre] = (entrada, None)
+        return entrada
+    
+    def crear_botones_historial(self, padre):
+        ttk.Button(padre, text="↷ Rehacer", 
+                  command=self.rehacer).pack(side='right', padx=5)
+        ttk.Button(padre, text="↶ Deshacer", 
+                  command=self.deshacer).pack(side='right', padx=5)
+        self.root.bind('<Control-z>', lambda e: self.deshacer())
+        self.root.bind('<Control-y>', lambda e: self.rehacer())
+    
+    def convertir_filas(self, df):
+        """Valores y tag de cada fila; las columnas se sacan una vez como arreglos"""
+        columnas = [columna_a_texto(df[columna]) for columna in self.COLUMNAS_TABLA]
+        tags = buscar_tags(df[self.COLUMNA_TAGS], self.TAGS, self.TAG_POR_DEFECTO)
+        return zip(zip(*columnas), tags)
+    
+    def leer_filtros(self):
+        filtros = {}
+        for nombre, (widget, todos) in self.filtros_vista.items():
+            valor = widget.get().strip()
+            filtros[nombre] = valor if valor and valor != todos else None
+        return filtros
+    
+    def limpiar_filtros(self):
+        for widget, todos in self.filtros_vista.values():
+            if todos is None:
+                widget.delete(0, 'end')
+            else:
+                widget.set(todos)
+    
+    def aplicar_filtros(self):
+        self.filtro.aplicar()
+    
+    def mostrar_filtrado(self, df):
+        self.mostrando_todo = False
+        self.tabla.mostrar(df)
+    
+    def mostrar_error_filtro(self, error):
+        messagebox.showerror("Error", f"No se pudo filtrar: {error}")
+    
+    def mostrar_resultado(self, df):
+        """Deja en la tabla un resultado que no viene de la barra de filtros"""
+        self.filtro.cancelar()
+        self.mostrando_todo = False
+        self.tabla.mostrar(df)
+    
+    def buscar_registro(self):
+        codigo = self.entry_buscar.get().strip().upper()
+        if not codigo:
+            messagebox.showwarning("Advertencia", "Ingresa un código para buscar")
+            return
+        
+        resultado = self.sistema.buscar(codigo)
+        if resultado is None:
+            messagebox.showerror("Error", f"No se encontró el código: {codigo}")
+            return
+        self.mostrar_resultado(resultado)
+    
+    def actualizar_tabla(self):
+        """Muestra el registro completo y deja la barra de filtros vacía"""
+        self.filtro.cancelar()
+        self.mostrando_todo = True
+        self.tabla.mostrar(self.sistema.obtener_todos())
+        self.limpiar_filtros()
+    
+    def al_cambiar_registro(self, cambios):
+        """Aviso del registro: aplica sobre la tabla solo las filas que cambiaron"""
+        if self.filtro.en_curso():
+            # La búsqueda en curso pudo leer el registro antes del cambio
+            self.filtro.aplicar()
+        if len(cambios) > 1:
+            # Cambios masivos: es más barato volver a llenar la ventana visible
+            self.tabla.mostrar(self.sistema.obtener_todos() if self.mostrando_todo else self.tabla.df)
+            return
+        
+        for operacion, codigo, etiqueta in cambios:
+            if operacion == 'actualizar':
+                # En memoria la vista completa es el DataFrame del registro, que ya tiene el cambio
+                compartida = self.sistema.EN_MEMORIA and self.tabla.df is self.sistema.obtener_todos()
+                self.tabla.actualizar_fila(codigo, self.sistema.buscar(codigo), compartida)
+            elif operacion == 'eliminar':
+                # En memoria la vista sigue siendo el DataFrame del registro; si no, se quita de la vista
+                compartida = self.mostrando_todo and self.sistema.EN_MEMORIA
+                self.tabla.quitar_fila(codigo, etiqueta, self.sistema.obtener_todos() if compartida else None)
+            elif operacion == 'agregar' and self.mostrando_todo:
+                if self.sistema.EN_MEMORIA:
+                    self.tabla.agregar_fila(self.sistema.obtener_todos())
+                else:
+                    # Sin volver a leer la tabla entera: la fila nueva se agrega al final de la vista
+                    self.tabla.agregar_fila(nuevas=self.sistema.buscar(codigo))
+    
+    def deshacer(self):
+        # La tabla se actualiza sola con el aviso del registro
+        if not self.sistema.deshacer():
+            self.root.bell()
+    
+    def rehacer(self):
+        if not self.sistema.rehacer():
+            self.root.bell()
+    
+    def cerrar(self):
+        # Espera a que termine la última escritura (o vuelca el diario) antes de salir
+        try:
+            self.sistema.cerrar()
+        except PermissionError as e:
+            messagebox.showerror("Error de Acceso", str(e))
+        self.root.destroy()
+
+def iniciar(clase, *argumentos, **opciones):
+    """Abre la ventana clase(root, ...) y corre Tk hasta que se cierre"""
+    try:
+        root = tk.Tk()
+        clase(root, *argumentos, **opciones)
+        root.mainloop()
+    except PermissionError as e:
+        root = tk.Tk()
+        root.withdraw()
+        messagebox.showerror("Error de Acceso", str(e))
+        root.destroy()